@@ -0,0 +1,96 @@
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from .metrics import TOKEN_CACHE_LOOKUPS
+
+
+class LRUCache:
+    def __init__(self, size, timeout):
+        self.size = size
+        self.timeout = timeout
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.timeout, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+
+COUNTER_FIELDS = ('recipes_count', 'followers_count')
+
+local_tokens = LRUCache(
+    settings.TOKEN_CACHE_LOCAL_SIZE,
+    settings.TOKEN_CACHE_LOCAL_TIMEOUT
+)
+
+
+def get_token_cache_key(key):
+    return f'token:{hashlib.sha256(key.encode()).hexdigest()}'
+
+
+def invalidate_token(key):
+    cache_key = get_token_cache_key(key)
+    local_tokens.delete(cache_key)
+    cache.delete(cache_key)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    def get_user(self, key):
+        model = self.get_model()
+        try:
+            token = model.objects.select_related('user').defer(
+                *(f'user__{field}' for field in COUNTER_FIELDS)
+            ).get(key=key)
+        except model.DoesNotExist:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(
+                _('User inactive or deleted.')
+            )
+        return token.user
+
+    def authenticate_credentials(self, key):
+        cache_key = get_token_cache_key(key)
+        user = local_tokens.get(cache_key)
+        if user is not None:
+            TOKEN_CACHE_LOOKUPS.labels('local').inc()
+            user = copy.copy(user)
+            return user, Token(key=key, user=user)
+        user = cache.get(cache_key)
+        if user is not None:
+            TOKEN_CACHE_LOOKUPS.labels('shared').inc()
+        else:
+            TOKEN_CACHE_LOOKUPS.labels('miss').inc()
+            user = self.get_user(key)
+            cache.set(cache_key, user, settings.TOKEN_CACHE_TIMEOUT)
+        local_tokens.set(cache_key, copy.copy(user))
+        return user, Token(key=key, user=user)
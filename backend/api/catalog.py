@@ -0,0 +1,85 @@
+import gzip
+import json
+import threading
+
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+from .versions import get_version
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+IDENTITY = 'identity'
+
+_lock = threading.Lock()
+_catalogs = {}
+
+
+def encode(data):
+    body = json.dumps(
+        data,
+        ensure_ascii=False,
+        separators=(',', ':')
+    ).encode()
+    encoded = {
+        IDENTITY: body,
+        'gzip': gzip.compress(body, compresslevel=9),
+    }
+    if brotli is not None:
+        encoded['br'] = brotli.compress(body)
+    return encoded
+
+
+def get_catalog(scope, build):
+    version = get_version(scope)
+    catalog = _catalogs.get(scope)
+    if catalog is None or catalog[0] != version:
+        with _lock:
+            catalog = _catalogs.get(scope)
+            if catalog is None or catalog[0] != version:
+                catalog = (version, encode(build()))
+                _catalogs[scope] = catalog
+    return catalog[1]
+
+
+def get_accepted_encodings(header):
+    accepted = {}
+    for part in header.split(','):
+        coding, _, params = part.strip().partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if coding:
+            accepted[coding.strip().lower()] = quality
+    return accepted
+
+
+def choose_encoding(request, encoded):
+    accepted = get_accepted_encodings(
+        request.META.get('HTTP_ACCEPT_ENCODING', '')
+    )
+    for coding in ('br', 'gzip'):
+        quality = accepted.get(coding, accepted.get('*', 0))
+        if coding in encoded and quality > 0:
+            return coding
+    return IDENTITY
+
+
+def catalog_response(request, scope, build):
+    encoded = get_catalog(scope, build)
+    coding = choose_encoding(request, encoded)
+    response = HttpResponse(
+        encoded[coding],
+        content_type='application/json'
+    )
+    if coding != IDENTITY:
+        response['Content-Encoding'] = coding
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
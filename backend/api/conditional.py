@@ -0,0 +1,52 @@
+from functools import wraps
+from hashlib import md5
+
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from rest_framework import status
+
+from .response_cache import get_request_digest
+from .versions import get_user_scope, get_versions
+
+
+def get_validators(request, scopes, weak=False):
+    versions = get_versions(*scopes)
+    digest = md5(
+        f'{get_request_digest(request)}:{versions}'.encode()
+    ).hexdigest()
+    etag = f'W/"{digest}"' if weak else f'"{digest}"'
+    return etag, max(versions) // 10 ** 9
+
+
+def conditional_get(*scopes, per_user=False, weak=False):
+    def decorator(method):
+        @wraps(method)
+        def wrapper(view, request, *args, **kwargs):
+            request_scopes = list(scopes)
+            if per_user and request.user.is_authenticated:
+                request_scopes.append(get_user_scope(request.user.id))
+            etag, last_modified = get_validators(
+                request,
+                request_scopes,
+                weak
+            )
+            response = get_conditional_response(
+                request,
+                etag=etag,
+                last_modified=last_modified
+            )
+            if response is None:
+                response = method(view, request, *args, **kwargs)
+            if response.status_code in (
+                status.HTTP_200_OK,
+                status.HTTP_304_NOT_MODIFIED
+            ):
+                response['ETag'] = etag
+                response['Last-Modified'] = http_date(last_modified)
+            if per_user:
+                patch_vary_headers(response, ('Authorization',))
+            return response
+
+        return wrapper
+
+    return decorator
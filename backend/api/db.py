@@ -0,0 +1,7 @@
+from django.db import connections
+
+
+def check_connections(**kwargs):
+    for connection in connections.all():
+        if connection.connection is not None and not connection.is_usable():
+            connection.close()
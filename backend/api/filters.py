@@ -1,19 +1,31 @@
+from django import forms
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import Exists, F, OuterRef
 from django_filters import rest_framework as filters
-from rest_framework.filters import SearchFilter
 
 from recipes.models import Recipe
+from .membership import FAVORITE, SHOPPING_CART, get_recipe_ids
+from .tag_index import get_tag_ids
 
 
-class IngredientFilter(SearchFilter):
-    search_param = 'name'
+class MultipleValueField(forms.Field):
+    widget = forms.SelectMultiple
+
+    def to_python(self, value):
+        return [item for item in value or () if item]
+
+
+class MultipleValueFilter(filters.Filter):
+    field_class = MultipleValueField
 
 
 class RecipeFilter(filters.FilterSet):
-    tags = filters.AllValuesMultipleFilter(field_name='tags__slug')
+    tags = MultipleValueFilter(method='get_tags')
     is_favorited = filters.BooleanFilter(method='get_is_favorited')
     is_in_shopping_cart = filters.BooleanFilter(
         method='get_is_in_shopping_cart'
     )
+    search = filters.CharFilter(method='get_search')
 
     class Meta:
         model = Recipe
@@ -21,17 +33,39 @@ class RecipeFilter(filters.FilterSet):
             'tags',
             'author',
             'is_favorited',
-            'is_in_shopping_cart'
+            'is_in_shopping_cart',
+            'search'
         )
 
+    def get_tags(self, queryset, name, value):
+        tag_ids = get_tag_ids(value)
+        if not tag_ids:
+            return queryset.none()
+        return queryset.filter(Exists(
+            Recipe.tags.through.objects.filter(
+                recipe_id=OuterRef('pk'),
+                tag_id__in=tag_ids
+            )
+        ))
+
     def get_is_favorited(self, queryset, name, value):
         user = self.request.user
         if value and not user.is_anonymous:
-            return queryset.filter(favorite__user=user)
+            return queryset.filter(
+                id__in=get_recipe_ids(user, FAVORITE)
+            )
         return queryset
 
     def get_is_in_shopping_cart(self, queryset, name, value):
         user = self.request.user
         if value and not user.is_anonymous:
-            return queryset.filter(shopping_cart__user=user)
+            return queryset.filter(
+                id__in=get_recipe_ids(user, SHOPPING_CART)
+            )
         return queryset
+
+    def get_search(self, queryset, name, value):
+        query = SearchQuery(value, config='russian', search_type='websearch')
+        return queryset.filter(search_vector=query).annotate(
+            rank=SearchRank(F('search_vector'), query)
+        ).order_by('-rank', '-id')
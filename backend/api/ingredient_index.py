@@ -0,0 +1,122 @@
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+
+from django.db import DatabaseError, connections
+from django.db.models import Count
+
+from recipes.models import Ingredient
+from .versions import INGREDIENTS, get_version
+
+REFRESH_INTERVAL = 60 * 10
+FUZZY_LIMIT = 20
+FUZZY_THRESHOLD = 0.3
+
+
+def normalize(text):
+    return ' '.join(text.casefold().replace('ё', 'е').split())
+
+
+def get_trigrams(text):
+    padded = f'  {text} '
+    return {padded[index:index + 3] for index in range(len(padded) - 2)}
+
+
+class IngredientIndex:
+    def __init__(self, rows):
+        rows = sorted(
+            (normalize(name), id, name, unit, usage)
+            for id, name, unit, usage in rows
+        )
+        self.keys = [row[0] for row in rows]
+        self.items = [
+            {'id': id, 'name': name, 'measurement_unit': unit}
+            for _, id, name, unit, _ in rows
+        ]
+        self.usage = [row[4] for row in rows]
+        self.trigrams = [get_trigrams(key) for key in self.keys]
+        self.postings = {}
+        for position, trigrams in enumerate(self.trigrams):
+            for trigram in trigrams:
+                self.postings.setdefault(trigram, []).append(position)
+
+    def rank(self, positions):
+        return [
+            self.items[position]
+            for position in sorted(
+                positions,
+                key=lambda position: (-self.usage[position], position)
+            )
+        ]
+
+    def search_prefix(self, query):
+        start = bisect_left(self.keys, query)
+        end = bisect_left(self.keys, query + '\uffff', start)
+        return self.rank(range(start, end))
+
+    def search_fuzzy(self, query):
+        trigrams = get_trigrams(query)
+        shared = Counter()
+        for trigram in trigrams:
+            shared.update(self.postings.get(trigram, ()))
+        scored = []
+        for position, common in shared.items():
+            score = common / (
+                len(trigrams) + len(self.trigrams[position]) - common
+            )
+            if score >= FUZZY_THRESHOLD:
+                scored.append((-score, -self.usage[position], position))
+        return [
+            self.items[position]
+            for _, _, position in sorted(scored)[:FUZZY_LIMIT]
+        ]
+
+    def search(self, query):
+        query = normalize(query)
+        if not query:
+            return []
+        return self.search_prefix(query) or self.search_fuzzy(query)
+
+
+_lock = threading.Lock()
+_index = None
+_version = None
+_built_at = 0
+
+
+def build_index():
+    return IngredientIndex(
+        Ingredient.objects.annotate(
+            usage=Count('IngredientAmount')
+        ).values_list('id', 'name', 'measurement_unit', 'usage')
+    )
+
+
+def is_stale(version):
+    return (
+        _index is None
+        or _version != version
+        or time.monotonic() - _built_at > REFRESH_INTERVAL
+    )
+
+
+def get_index():
+    global _index, _version, _built_at
+    version = get_version(INGREDIENTS)
+    if is_stale(version):
+        with _lock:
+            if is_stale(version):
+                _index = build_index()
+                _version = version
+                _built_at = time.monotonic()
+    return _index
+
+
+def warm_up():
+    try:
+        get_index()
+    except DatabaseError:
+        pass
+    finally:
+        connections.close_all()
@@ -0,0 +1,115 @@
+from array import array
+from bisect import bisect_left
+
+from django.core.cache import cache
+from django.db import connection, transaction
+
+from recipes import totals
+from recipes.counters import change_counters
+from recipes.models import Favorite, Recipe, ShoppingCart
+from .versions import (
+    bump_version,
+    get_cart_scope,
+    get_membership_scope,
+    get_user_scope,
+    get_version
+)
+
+FAVORITE = 'favorite'
+SHOPPING_CART = 'shopping_cart'
+MODELS = {
+    FAVORITE: Favorite,
+    SHOPPING_CART: ShoppingCart,
+}
+COUNTERS = {
+    FAVORITE: 'favorites_count',
+    SHOPPING_CART: 'in_carts_count',
+}
+ADDED = 'added'
+EXISTS = 'exists'
+REMOVED = 'removed'
+NOT_FOUND = 'not_found'
+TIMEOUT = 60 * 60 * 24
+
+
+def get_recipe_ids(user, kind):
+    version = get_version(get_membership_scope(kind, user.id))
+    key = f'membership:{kind}:{user.id}:{version}'
+    recipe_ids = cache.get(key)
+    if recipe_ids is None:
+        recipe_ids = array('q', sorted(
+            MODELS[kind].objects.filter(
+                user=user
+            ).values_list('recipe_id', flat=True)
+        ))
+        cache.set(key, recipe_ids, TIMEOUT)
+    return recipe_ids
+
+
+def contains(recipe_ids, recipe_id):
+    index = bisect_left(recipe_ids, recipe_id)
+    return index < len(recipe_ids) and recipe_ids[index] == recipe_id
+
+
+def get_table(model):
+    return connection.ops.quote_name(model._meta.db_table)
+
+
+def apply_changes(user_id, kind, recipe_ids, delta):
+    change_counters(Recipe, recipe_ids, COUNTERS[kind], delta)
+    scopes = [get_user_scope(user_id), get_membership_scope(kind, user_id)]
+    if kind == SHOPPING_CART:
+        if delta > 0:
+            totals.add_recipes(user_id, recipe_ids)
+        else:
+            totals.remove_recipes(user_id, recipe_ids)
+        scopes.append(get_cart_scope(user_id))
+    bump_version(*scopes)
+
+
+@transaction.atomic
+def add_recipes(user_id, kind, recipe_ids):
+    table = get_table(MODELS[kind])
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'WITH found AS ('
+            f'SELECT id FROM {get_table(Recipe)} WHERE id = ANY(%s)'
+            f'), inserted AS ('
+            f'INSERT INTO {table} (user_id, recipe_id) '
+            f'SELECT %s, id FROM found '
+            f'ON CONFLICT (user_id, recipe_id) DO NOTHING '
+            f'RETURNING recipe_id'
+            f') SELECT found.id, inserted.recipe_id IS NOT NULL '
+            f'FROM found LEFT JOIN inserted ON inserted.recipe_id = found.id',
+            [list(recipe_ids), user_id]
+        )
+        found = dict(cursor.fetchall())
+    added = [recipe_id for recipe_id, inserted in found.items() if inserted]
+    if added:
+        apply_changes(user_id, kind, added, 1)
+    return {
+        recipe_id: (
+            NOT_FOUND if recipe_id not in found
+            else ADDED if found[recipe_id]
+            else EXISTS
+        )
+        for recipe_id in recipe_ids
+    }
+
+
+@transaction.atomic
+def remove_recipes(user_id, kind, recipe_ids):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {get_table(MODELS[kind])} '
+            f'WHERE user_id = %s AND recipe_id = ANY(%s) '
+            f'RETURNING recipe_id',
+            [user_id, list(recipe_ids)]
+        )
+        removed = [recipe_id for recipe_id, in cursor.fetchall()]
+    if removed:
+        apply_changes(user_id, kind, removed, -1)
+    return {
+        recipe_id: REMOVED if recipe_id in removed else NOT_FOUND
+        for recipe_id in recipe_ids
+    }
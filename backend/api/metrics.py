@@ -0,0 +1,140 @@
+import os
+import threading
+import time
+
+from django.http import HttpResponse
+from django.views.decorators.http import require_GET
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess
+)
+
+from . import response_cache
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+_local = threading.local()
+
+REQUEST_DURATION = Histogram(
+    'foodgram_request_duration_seconds',
+    'Time spent handling a request.',
+    ('route', 'method'),
+    buckets=LATENCY_BUCKETS
+)
+DB_QUERIES = Histogram(
+    'foodgram_db_queries',
+    'Database queries executed per request.',
+    ('route',),
+    buckets=QUERY_BUCKETS
+)
+DB_DURATION = Histogram(
+    'foodgram_db_duration_seconds',
+    'Time spent in database queries per request.',
+    ('route',),
+    buckets=LATENCY_BUCKETS
+)
+SERIALIZER_DURATION = Histogram(
+    'foodgram_serializer_duration_seconds',
+    'Time spent in serializer to_representation per request.',
+    ('route',),
+    buckets=LATENCY_BUCKETS
+)
+RESPONSE_SIZE = Histogram(
+    'foodgram_response_size_bytes',
+    'Size of non-streaming response bodies.',
+    ('route',),
+    buckets=SIZE_BUCKETS
+)
+TOKEN_CACHE_LOOKUPS = Counter(
+    'foodgram_token_cache_lookups',
+    'Token authentication lookups by the level that answered them.',
+    ('result',)
+)
+
+
+class QueryTimer:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - started
+
+
+def start_request():
+    _local.serializer_depth = 0
+    _local.serializer_duration = 0
+
+
+def time_serializer(represent, instance):
+    depth = getattr(_local, 'serializer_depth', None)
+    if depth is None or depth:
+        return represent(instance)
+    _local.serializer_depth = 1
+    started = time.perf_counter()
+    try:
+        return represent(instance)
+    finally:
+        _local.serializer_duration += time.perf_counter() - started
+        _local.serializer_depth = 0
+
+
+def finish_request(request, response, duration, queries):
+    match = request.resolver_match
+    route = match.view_name if match else 'unmatched'
+    REQUEST_DURATION.labels(route, request.method).observe(duration)
+    DB_QUERIES.labels(route).observe(queries.count)
+    DB_DURATION.labels(route).observe(queries.duration)
+    SERIALIZER_DURATION.labels(route).observe(
+        getattr(_local, 'serializer_duration', 0)
+    )
+    if not response.streaming:
+        RESPONSE_SIZE.labels(route).observe(len(response.content))
+    _local.serializer_depth = None
+
+
+def render_counter(name, help_text, value):
+    return (
+        f'# HELP {name} {help_text}\n'
+        f'# TYPE {name} counter\n'
+        f'{name} {value}\n'
+    )
+
+
+def get_registry():
+    if 'PROMETHEUS_MULTIPROC_DIR' not in os.environ:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+@require_GET
+def metrics(request):
+    stats = response_cache.get_stats()
+    body = ''.join((
+        render_counter(
+            'foodgram_response_cache_hits_total',
+            'Anonymous recipe responses served from the cache.',
+            stats['hits']
+        ),
+        render_counter(
+            'foodgram_response_cache_misses_total',
+            'Anonymous recipe responses built from the database.',
+            stats['misses']
+        ),
+        generate_latest(get_registry()).decode(),
+    ))
+    return HttpResponse(body, content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,78 @@
+import hashlib
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from rest_framework.permissions import SAFE_METHODS
+
+from . import metrics
+from .replicas import allow_replica_reads
+
+PRIMARY_COOKIE = 'use_primary'
+
+
+class MetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = metrics.QueryTimer()
+        metrics.start_request()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(queries))
+            response = self.get_response(request)
+        metrics.finish_request(
+            request,
+            response,
+            time.perf_counter() - started,
+            queries
+        )
+        return response
+
+
+class ReplicaMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def get_pin_key(self, request):
+        authorization = request.META.get('HTTP_AUTHORIZATION')
+        if not authorization:
+            return None
+        digest = hashlib.sha256(authorization.encode()).hexdigest()
+        return f'primary:{digest}'
+
+    def is_pinned(self, request):
+        if PRIMARY_COOKIE in request.COOKIES:
+            return True
+        key = self.get_pin_key(request)
+        return key is not None and cache.get(key) is not None
+
+    def pin(self, request, response):
+        window = settings.REPLICA_PIN_SECONDS
+        response.set_cookie(
+            PRIMARY_COOKIE,
+            '1',
+            max_age=window,
+            httponly=True,
+            samesite='Lax'
+        )
+        key = self.get_pin_key(request)
+        if key is not None:
+            cache.set(key, True, window)
+
+    def __call__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+        safe = request.method in SAFE_METHODS
+        previous = allow_replica_reads(safe and not self.is_pinned(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            allow_replica_reads(previous)
+        if not safe:
+            self.pin(request, response)
+        return response
@@ -0,0 +1,72 @@
+from collections import OrderedDict
+
+from rest_framework.pagination import (
+    BasePagination,
+    CursorPagination,
+    _positive_int
+)
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class RecipeCursorPagination(CursorPagination):
+    ordering = '-id'
+    page_size_query_param = 'limit'
+    max_page_size = 100
+    mode_query_param = 'pagination'
+    mode = 'cursor'
+
+    @classmethod
+    def is_requested(cls, request):
+        return (
+            request.query_params.get(cls.mode_query_param) == cls.mode
+            or cls.cursor_query_param in request.query_params
+        )
+
+
+class FeedPagination(BasePagination):
+    before_query_param = 'before'
+    page_size_query_param = 'limit'
+    max_page_size = 100
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True,
+                cutoff=self.max_page_size
+            )
+        except (KeyError, ValueError):
+            return api_settings.PAGE_SIZE
+
+    def get_before(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.before_query_param],
+                strict=True
+            )
+        except (KeyError, ValueError):
+            return None
+
+    def paginate_ids(self, get_ids, request):
+        self.request = request
+        page_size = self.get_page_size(request)
+        ids = get_ids(self.get_before(request), page_size + 1)
+        self.next_before = ids[page_size - 1] if len(ids) > page_size else None
+        return ids[:page_size]
+
+    def get_next_link(self):
+        if self.next_before is None:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.before_query_param,
+            self.next_before
+        )
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
@@ -0,0 +1,61 @@
+from functools import wraps
+from hashlib import md5
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+
+from .versions import RECIPES, get_version
+
+TIMEOUT = 60 * 10
+HITS = 'response_cache:hits'
+MISSES = 'response_cache:misses'
+
+
+def get_request_digest(request):
+    params = urlencode(sorted(
+        (key, value)
+        for key in request.query_params
+        for value in request.query_params.getlist(key)
+    ))
+    url = f'{request.scheme}://{request.get_host()}{request.path}?{params}'
+    return md5(url.encode()).hexdigest()
+
+
+def get_cache_key(request):
+    return f'response:{get_version(RECIPES)}:{get_request_digest(request)}'
+
+
+def increment(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+
+
+def get_stats():
+    return {
+        'hits': cache.get(HITS, 0),
+        'misses': cache.get(MISSES, 0),
+    }
+
+
+def cache_anonymous_response(method):
+    @wraps(method)
+    def wrapper(view, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return method(view, request, *args, **kwargs)
+        key = get_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            increment(HITS)
+            return Response(data)
+        increment(MISSES)
+        response = method(view, request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data, TIMEOUT)
+        return response
+
+    return wrapper
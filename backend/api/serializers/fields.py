@@ -0,0 +1,24 @@
+from django.core.files.storage import default_storage
+from rest_framework import serializers
+
+from recipes.images import get_variant_names
+
+
+class ImageVariantsField(serializers.Field):
+    def __init__(self, **kwargs):
+        kwargs['source'] = '*'
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, recipe):
+        if not recipe.image:
+            return {}
+        request = self.context.get('request')
+        urls = {}
+        for name in get_variant_names():
+            path = recipe.image_variants.get(name)
+            url = default_storage.url(path) if path else recipe.image.url
+            if request is not None:
+                url = request.build_absolute_uri(url)
+            urls[name] = url
+        return urls
@@ -0,0 +1,9 @@
+from .. import metrics
+
+
+class TimedSerializerMixin:
+    def to_representation(self, instance):
+        return metrics.time_serializer(
+            super().to_representation,
+            instance
+        )
@@ -3,18 +3,28 @@ from drf_extra_fields.fields import Base64ImageField
 from rest_framework import serializers
 from rest_framework.validators import UniqueTogetherValidator
 
+from recipes import totals
 from recipes.models import (
     Favorite,
     Ingredient,
     IngredientAmount,
     Recipe,
     ShoppingCart,
+    ShoppingTotal,
     Tag
 )
+from ..membership import (
+    FAVORITE,
+    SHOPPING_CART,
+    contains,
+    get_recipe_ids
+)
+from .fields import ImageVariantsField
+from .mixins import TimedSerializerMixin
 from .users import UserSerializer
 
 
-class IngredientSerializer(serializers.ModelSerializer):
+class IngredientSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Ingredient
         fields = (
@@ -24,7 +34,7 @@ class IngredientSerializer(serializers.ModelSerializer):
         )
 
 
-class TagSerializer(serializers.ModelSerializer):
+class TagSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Tag
         fields = (
@@ -66,6 +76,34 @@ class IngredientAmountSerializer(serializers.ModelSerializer):
         )
 
 
+class RecipeIdsSerializer(serializers.Serializer):
+    recipes = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=100,
+    )
+
+
+class ShoppingTotalSerializer(
+    TimedSerializerMixin,
+    serializers.ModelSerializer
+):
+    id = serializers.ReadOnlyField(source='ingredient.id')
+    name = serializers.ReadOnlyField(source='ingredient.name')
+    measurement_unit = serializers.ReadOnlyField(
+        source='ingredient.measurement_unit'
+    )
+
+    class Meta:
+        model = ShoppingTotal
+        fields = (
+            'id',
+            'name',
+            'measurement_unit',
+            'amount'
+        )
+
+
 class RecipeCreateSerializer(serializers.ModelSerializer):
     ingredients = AddIngredientInRecipeSerializer(many=True)
     image = Base64ImageField()
@@ -130,6 +168,8 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
             'ingredients',
             None
         )
+        if 'image' in validated_data:
+            validated_data['image_variants'] = {}
         recipe = super().update(
             instance,
             validated_data
@@ -140,6 +180,7 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
                 ingredients,
                 recipe
             )
+            totals.add_recipe_to_carts(recipe.id)
         if tags:
             recipe.tags.set(tags)
         return recipe
@@ -152,7 +193,7 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
             context=context).data
 
 
-class RecipeGETSerializer(serializers.ModelSerializer):
+class RecipeGETSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     author = UserSerializer(read_only=True)
     ingredients = IngredientAmountSerializer(
         many=True,
@@ -163,14 +204,9 @@ class RecipeGETSerializer(serializers.ModelSerializer):
         read_only=True
     )
     image = Base64ImageField()
-    is_favorited = serializers.BooleanField(
-        read_only=True,
-        default=False
-    )
-    is_in_shopping_cart = serializers.BooleanField(
-        read_only=True,
-        default=False
-    )
+    image_variants = ImageVariantsField()
+    is_favorited = serializers.SerializerMethodField()
+    is_in_shopping_cart = serializers.SerializerMethodField()
 
     class Meta:
         model = Recipe
@@ -183,13 +219,29 @@ class RecipeGETSerializer(serializers.ModelSerializer):
             'is_in_shopping_cart',
             'name',
             'image',
+            'image_variants',
             'text',
             'cooking_time'
         )
 
+    def get_membership(self, object, kind):
+        request = self.context.get('request')
+        if request is None or request.user.is_anonymous:
+            return False
+        if kind not in self.context:
+            self.context[kind] = get_recipe_ids(request.user, kind)
+        return contains(self.context[kind], object.id)
+
+    def get_is_favorited(self, object):
+        return self.get_membership(object, FAVORITE)
+
+    def get_is_in_shopping_cart(self, object):
+        return self.get_membership(object, SHOPPING_CART)
+
 
-class RecipeShortSerializer(serializers.ModelSerializer):
+class RecipeShortSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     image = Base64ImageField(read_only=True)
+    image_variants = ImageVariantsField()
 
     class Meta:
         model = Recipe
@@ -197,6 +249,7 @@ class RecipeShortSerializer(serializers.ModelSerializer):
             'id',
             'name',
             'image',
+            'image_variants',
             'cooking_time'
         )
 
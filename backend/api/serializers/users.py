@@ -7,9 +7,11 @@ from rest_framework import serializers
 
 from recipes.models import Recipe
 from users.models import Subscribe, User
+from .fields import ImageVariantsField
+from .mixins import TimedSerializerMixin
 
 
-class UserSerializer(DjoserUserSerializer):
+class UserSerializer(TimedSerializerMixin, DjoserUserSerializer):
     is_subscribed = serializers.SerializerMethodField(read_only=True)
 
     class Meta:
@@ -24,6 +26,8 @@ class UserSerializer(DjoserUserSerializer):
         )
 
     def get_is_subscribed(self, object):
+        if hasattr(object, 'is_subscribed'):
+            return object.is_subscribed
         request = self.context.get('request')
         return request.user.is_authenticated and Subscribe.objects.filter(
             follow=request.user,
@@ -44,8 +48,9 @@ class UserCreateSerializer(DjoserUserCreateSerializer):
         )
 
 
-class RecipeShortSerializer(serializers.ModelSerializer):
+class RecipeShortSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     image = Base64ImageField(read_only=True)
+    image_variants = ImageVariantsField()
 
     class Meta:
         model = Recipe
@@ -53,13 +58,14 @@ class RecipeShortSerializer(serializers.ModelSerializer):
             'id',
             'name',
             'image',
+            'image_variants',
             'cooking_time'
         )
 
 
 class SubscribeSerializer(UserSerializer):
     recipes = serializers.SerializerMethodField()
-    recipes_count = serializers.SerializerMethodField()
+    recipes_count = serializers.ReadOnlyField()
 
     class Meta:
         model = User
@@ -81,16 +87,15 @@ class SubscribeSerializer(UserSerializer):
         ]
 
     def get_recipes(self, object):
-        request = self.context.get('request')
-        limit = request.GET.get('recipes_limit')
-        recipes = object.recipes.all()
-        if limit:
-            recipes = recipes[:int(limit)]
+        recipes = getattr(object, 'limited_recipes', None)
+        if recipes is None:
+            request = self.context.get('request')
+            limit = request.GET.get('recipes_limit')
+            recipes = object.recipes.all()
+            if limit:
+                recipes = recipes[:int(limit)]
         serializer = RecipeShortSerializer(
             recipes,
             many=True
         )
         return serializer.data
-
-    def get_recipes_count(self, object):
-        return object.recipes.count()
@@ -1,22 +1,173 @@
+import csv
 import io
 
-from django.db.models import Sum
-from recipes.models import IngredientAmount
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import (
+    BooleanField,
+    Exists,
+    OuterRef,
+    Prefetch,
+    Value,
+    prefetch_related_objects
+)
+from django.db.models.expressions import RawSQL
 
+from recipes.models import Recipe, ShoppingTotal
+from users.models import Subscribe
+from .versions import INGREDIENTS, get_cart_scope, get_versions
 
-def get_shopping_list(request):
-    user = request.user
-    ingredients = IngredientAmount.objects.filter(
-        recipe__shopping_cart__user=user
+SHOPPING_LIST_TITLE = 'Нужно купить:'
+SHOPPING_LIST_TIMEOUT = 60 * 60
+PDF_FONT = 'Arial'
+
+
+def get_shopping_items(user):
+    return ShoppingTotal.objects.filter(
+        user=user
     ).order_by('ingredient__name').values(
         'ingredient__name',
-        'ingredient__measurement_unit'
-    ).annotate(amount=Sum('amount'))
-    shopping_list = 'Нужно купить:'
+        'ingredient__measurement_unit',
+        'amount'
+    )
+
+
+def render_txt(items):
+    yield f'{SHOPPING_LIST_TITLE}\n'.encode()
+    for item in items:
+        yield (
+            f"{item['ingredient__name']} - "
+            f"{item['amount']}"
+            f"{item['ingredient__measurement_unit']} \n"
+        ).encode()
+
+
+def render_csv(items):
     buffer = io.StringIO()
-    buffer.write(f'{shopping_list}\n')
-    for item in ingredients:
-        buffer.write(f"{item['ingredient__name']} - ")
-        buffer.write(f"{item['amount']}")
-        buffer.write(f"{item['ingredient__measurement_unit']} \n")
-    return buffer.getvalue()
+    writer = csv.writer(buffer)
+    rows = (
+        (
+            item['ingredient__name'],
+            item['amount'],
+            item['ingredient__measurement_unit']
+        )
+        for item in items
+    )
+    for row in ((
+        'Ингредиент',
+        'Количество',
+        'Единица измерения'
+    ), *rows):
+        writer.writerow(row)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def render_pdf(items):
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+    from reportlab.pdfgen import canvas
+
+    if PDF_FONT not in pdfmetrics.getRegisteredFontNames():
+        pdfmetrics.registerFont(
+            TTFont(PDF_FONT, settings.CSV_FILES_DIR / 'arial.ttf')
+        )
+    buffer = io.BytesIO()
+    page = canvas.Canvas(buffer, pagesize=A4)
+    width, height = A4
+    top, bottom, left, line_height = height - 60, 50, 50, 20
+    page.setFont(PDF_FONT, 16)
+    page.drawString(left, top, SHOPPING_LIST_TITLE)
+    page.setFont(PDF_FONT, 12)
+    y = top - line_height * 1.5
+    for item in items:
+        if y < bottom:
+            page.showPage()
+            page.setFont(PDF_FONT, 12)
+            y = top
+        page.drawString(
+            left,
+            y,
+            f"{item['ingredient__name']} - "
+            f"{item['amount']} {item['ingredient__measurement_unit']}"
+        )
+        y -= line_height
+    page.save()
+    yield buffer.getvalue()
+
+
+SHOPPING_LIST_RENDERERS = {
+    'txt': render_txt,
+    'csv': render_csv,
+    'pdf': render_pdf,
+}
+
+
+def get_shopping_list_key(user, file_format):
+    cart_version, ingredients_version = get_versions(
+        get_cart_scope(user.id),
+        INGREDIENTS
+    )
+    return (
+        f'shopping_list:{user.id}:{file_format}:'
+        f'{cart_version}:{ingredients_version}'
+    )
+
+
+def get_cached_shopping_list(user, file_format):
+    return cache.get(get_shopping_list_key(user, file_format))
+
+
+def stream_shopping_list(user, file_format):
+    key = get_shopping_list_key(user, file_format)
+    rendered = []
+    items = get_shopping_items(user).iterator()
+    for chunk in SHOPPING_LIST_RENDERERS[file_format](items):
+        rendered.append(chunk)
+        yield chunk
+    cache.set(key, b''.join(rendered), SHOPPING_LIST_TIMEOUT)
+
+
+def annotate_is_subscribed(queryset, user):
+    if user.is_anonymous:
+        return queryset.annotate(
+            is_subscribed=Value(False, output_field=BooleanField())
+        )
+    return queryset.annotate(
+        is_subscribed=Exists(
+            Subscribe.objects.filter(
+                follow=user,
+                author=OuterRef('pk')
+            )
+        )
+    )
+
+
+def get_recipes_limit(request):
+    try:
+        limit = int(request.query_params.get('recipes_limit'))
+    except (TypeError, ValueError):
+        return None
+    return limit if limit >= 0 else None
+
+
+def prefetch_limited_recipes(authors, limit):
+    queryset = Recipe.objects.all()
+    author_ids = [author.id for author in authors]
+    if limit is not None and author_ids:
+        placeholders = ', '.join(['%s'] * len(author_ids))
+        queryset = queryset.filter(id__in=RawSQL(
+            f'SELECT ranked.id FROM ('
+            f'SELECT id, ROW_NUMBER() OVER ('
+            f'PARTITION BY author_id ORDER BY id DESC'
+            f') AS position FROM {Recipe._meta.db_table} '
+            f'WHERE author_id IN ({placeholders})'
+            f') AS ranked WHERE ranked.position <= %s',
+            (*author_ids, limit)
+        ))
+    prefetch_related_objects(
+        authors,
+        Prefetch('recipes', queryset=queryset, to_attr='limited_recipes')
+    )
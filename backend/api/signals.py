@@ -0,0 +1,95 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from rest_framework.authtoken.models import Token
+
+from recipes.models import (
+    Favorite,
+    Ingredient,
+    IngredientAmount,
+    Recipe,
+    ShoppingCart,
+    Tag
+)
+from users.models import Subscribe, User
+from .authentication import invalidate_token
+from .membership import FAVORITE, SHOPPING_CART
+from .versions import (
+    INGREDIENTS,
+    RECIPES,
+    TAGS,
+    bump_version,
+    get_cart_scope,
+    get_membership_scope,
+    get_user_scope
+)
+
+
+def bump_recipes_version(sender, **kwargs):
+    if kwargs.get('update_fields') == frozenset(('last_login',)):
+        return
+    bump_version(RECIPES)
+
+
+def bump_tags_version(sender, **kwargs):
+    bump_version(TAGS)
+
+
+def bump_ingredients_version(sender, **kwargs):
+    bump_version(INGREDIENTS)
+
+
+def bump_user_version(sender, instance, **kwargs):
+    user_id = instance.follow_id if sender is Subscribe else instance.user_id
+    bump_version(get_user_scope(user_id))
+
+
+def bump_membership_version(sender, instance, **kwargs):
+    kind = FAVORITE if sender is Favorite else SHOPPING_CART
+    bump_version(get_membership_scope(kind, instance.user_id))
+
+
+def bump_cart_version(sender, instance, **kwargs):
+    bump_version(get_cart_scope(instance.user_id))
+
+
+def bump_carts_with_recipe_version(sender, instance, **kwargs):
+    user_ids = ShoppingCart.objects.filter(
+        recipe_id=instance.recipe_id
+    ).values_list('user_id', flat=True)
+    if user_ids:
+        bump_version(*map(get_cart_scope, user_ids))
+
+
+def invalidate_deleted_token(sender, instance, **kwargs):
+    invalidate_token(instance.key)
+
+
+def invalidate_user_tokens(sender, instance, **kwargs):
+    if kwargs.get('update_fields') == frozenset(('last_login',)):
+        return
+    for key in Token.objects.filter(user=instance).values_list(
+        'key',
+        flat=True
+    ):
+        invalidate_token(key)
+
+
+for model in (Recipe, IngredientAmount, Ingredient, Tag, User):
+    post_save.connect(bump_recipes_version, sender=model)
+    post_delete.connect(bump_recipes_version, sender=model)
+m2m_changed.connect(bump_recipes_version, sender=Recipe.tags.through)
+
+for model, handler in (
+    (Tag, bump_tags_version),
+    (Ingredient, bump_ingredients_version),
+    (Favorite, bump_user_version),
+    (ShoppingCart, bump_user_version),
+    (Subscribe, bump_user_version),
+    (Favorite, bump_membership_version),
+    (ShoppingCart, bump_membership_version),
+    (ShoppingCart, bump_cart_version),
+    (IngredientAmount, bump_carts_with_recipe_version),
+):
+    post_save.connect(handler, sender=model)
+    post_delete.connect(handler, sender=model)
+post_delete.connect(invalidate_deleted_token, sender=Token)
+post_save.connect(invalidate_user_tokens, sender=User)
@@ -0,0 +1,19 @@
+import threading
+
+from recipes.models import Tag
+from .versions import TAGS, get_version
+
+_lock = threading.Lock()
+_tag_ids = {}
+_version = None
+
+
+def get_tag_ids(slugs):
+    global _tag_ids, _version
+    version = get_version(TAGS)
+    if version != _version:
+        with _lock:
+            if version != _version:
+                _tag_ids = dict(Tag.objects.values_list('slug', 'id'))
+                _version = version
+    return [_tag_ids[slug] for slug in slugs if slug in _tag_ids]
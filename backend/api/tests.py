@@ -0,0 +1,471 @@
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Sum
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient, APITestCase
+
+from recipes.models import (
+    Favorite,
+    Ingredient,
+    IngredientAmount,
+    Recipe,
+    ShoppingCart,
+    ShoppingTotal,
+    Tag,
+    TimelineEntry
+)
+from users.models import Subscribe, User
+from .replicas import allow_replica_reads
+
+REPLICA = 'replica'
+
+if REPLICA not in connections:
+    connections.settings[REPLICA] = {
+        **connections.settings[DEFAULT_DB_ALIAS],
+        'TEST': {
+            **connections.settings[DEFAULT_DB_ALIAS]['TEST'],
+            'MIRROR': DEFAULT_DB_ALIAS,
+        },
+    }
+
+
+class RecipeTestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        tags = [
+            Tag.objects.create(
+                name=f'Тег {index}',
+                color=f'#00000{index}',
+                slug=f'tag-{index}'
+            )
+            for index in range(3)
+        ]
+        ingredients = [
+            Ingredient.objects.create(
+                name=f'Ингредиент {index}',
+                measurement_unit='г'
+            )
+            for index in range(3)
+        ]
+        authors = [
+            User.objects.create_user(
+                username=f'author{index}',
+                email=f'author{index}@example.com',
+                password='password-12345',
+                first_name='Имя',
+                last_name='Фамилия'
+            )
+            for index in range(3)
+        ]
+        cls.user = User.objects.create_user(
+            username='reader',
+            email='reader@example.com',
+            password='password-12345',
+            first_name='Имя',
+            last_name='Фамилия'
+        )
+        Subscribe.objects.create(follow=cls.user, author=authors[0])
+        cls.author = authors[0]
+        for index in range(6):
+            recipe = Recipe.objects.create(
+                name=f'Рецепт {index}',
+                text='Описание',
+                image='recipes/test.png',
+                cooking_time=10,
+                author=authors[index % len(authors)]
+            )
+            recipe.tags.set(tags[:index % len(tags) + 1])
+            IngredientAmount.objects.bulk_create(
+                IngredientAmount(
+                    recipe=recipe,
+                    ingredient=ingredient,
+                    amount=index + 1
+                )
+                for ingredient in ingredients
+            )
+        cls.recipe = recipe
+        Favorite.objects.create(user=cls.user, recipe=recipe)
+        ShoppingCart.objects.create(user=cls.user, recipe=recipe)
+
+    def setUp(self):
+        cache.clear()
+
+
+class RecipeQueryCountTest(RecipeTestCase):
+    def test_anonymous_list(self):
+        with self.assertNumQueries(5):
+            response = self.client.get('/api/recipes/')
+        self.assertEqual(response.data['count'], 6)
+
+    def test_anonymous_detail(self):
+        with self.assertNumQueries(4):
+            response = self.client.get(f'/api/recipes/{self.recipe.id}/')
+        self.assertEqual(response.data['id'], self.recipe.id)
+
+    def test_authenticated_list(self):
+        self.client.force_authenticate(self.user)
+        with self.assertNumQueries(7):
+            response = self.client.get('/api/recipes/')
+        self.assertEqual(response.data['count'], 6)
+
+    def test_authenticated_detail(self):
+        self.client.force_authenticate(self.user)
+        with self.assertNumQueries(6):
+            response = self.client.get(f'/api/recipes/{self.recipe.id}/')
+        self.assertTrue(response.data['is_favorited'])
+        self.assertTrue(response.data['is_in_shopping_cart'])
+
+    def test_list_does_not_grow_with_recipes(self):
+        author = User.objects.create_user(
+            username='author-extra',
+            email='author-extra@example.com',
+            password='password-12345',
+            first_name='Имя',
+            last_name='Фамилия'
+        )
+        tag = Tag.objects.create(name='Тег', color='#ffffff', slug='tag')
+        for index in range(6):
+            recipe = Recipe.objects.create(
+                name=f'Новый рецепт {index}',
+                text='Описание',
+                image='recipes/test.png',
+                cooking_time=10,
+                author=author
+            )
+            recipe.tags.add(tag)
+        self.client.force_authenticate(self.user)
+        with self.assertNumQueries(7):
+            response = self.client.get('/api/recipes/')
+        self.assertEqual(response.data['count'], 12)
+
+
+class MembershipTest(RecipeTestCase):
+    def get_flags(self):
+        response = self.client.get('/api/recipes/')
+        return {
+            recipe['id']: (
+                recipe['is_favorited'],
+                recipe['is_in_shopping_cart']
+            )
+            for recipe in response.data['results']
+        }
+
+    def test_changes_outside_api_reach_flags(self):
+        self.client.force_authenticate(self.user)
+        recipe = Recipe.objects.exclude(pk=self.recipe.pk).first()
+        self.assertEqual(self.get_flags()[recipe.id], (False, False))
+        self.assertTrue(self.get_flags()[self.recipe.id][0])
+        with self.captureOnCommitCallbacks(execute=True):
+            Favorite.objects.create(user=self.user, recipe=recipe)
+            ShoppingCart.objects.create(user=self.user, recipe=recipe)
+            Favorite.objects.filter(
+                user=self.user,
+                recipe=self.recipe
+            ).delete()
+        flags = self.get_flags()
+        self.assertEqual(flags[recipe.id], (True, True))
+        self.assertEqual(flags[self.recipe.id], (False, True))
+
+
+class ShoppingListDownloadTest(RecipeTestCase):
+    url = '/api/recipes/download_shopping_cart/'
+
+    def download(self, url, **headers):
+        response = self.client.get(url, **headers)
+        if response.streaming:
+            b''.join(response.streaming_content)
+        return response
+
+    def test_format_ignores_accept_header(self):
+        self.client.force_authenticate(self.user)
+        response = self.download(self.url, HTTP_ACCEPT='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        response = self.download(
+            f'{self.url}?format=csv',
+            HTTP_ACCEPT='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/csv'))
+
+    def test_unknown_format(self):
+        self.client.force_authenticate(self.user)
+        response = self.download(f'{self.url}?format=xml')
+        self.assertEqual(response.status_code, 404)
+
+
+class ShoppingTotalTest(RecipeTestCase):
+    def get_totals(self):
+        return dict(ShoppingTotal.objects.filter(
+            user=self.user
+        ).values_list('ingredient_id', 'amount'))
+
+    def get_expected(self, recipe):
+        return dict(IngredientAmount.objects.filter(
+            recipe=recipe
+        ).values_list('ingredient_id', 'amount'))
+
+    def test_drifted_totals_do_not_break_removal(self):
+        ShoppingTotal.objects.filter(user=self.user).update(amount=1)
+        self.client.force_authenticate(self.user)
+        response = self.client.delete(
+            f'/api/recipes/{self.recipe.id}/shopping_cart/'
+        )
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.get_totals(), {})
+
+    def test_changed_cart_row_moves_totals(self):
+        recipe = Recipe.objects.exclude(pk=self.recipe.pk).first()
+        cart = ShoppingCart.objects.get(user=self.user)
+        cart.recipe = recipe
+        cart.save()
+        self.assertEqual(self.get_totals(), self.get_expected(recipe))
+        cart.save()
+        self.assertEqual(self.get_totals(), self.get_expected(recipe))
+
+
+class FeedTest(RecipeTestCase):
+    def get_feed(self, url='/api/recipes/feed/?limit=1'):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return (
+            [recipe['id'] for recipe in response.data['results']],
+            response.data['next']
+        )
+
+    def test_pages_through_followed_authors(self):
+        self.client.force_authenticate(self.user)
+        expected = list(Recipe.objects.filter(
+            author=self.author
+        ).values_list('id', flat=True))
+        self.assertEqual(len(expected), 2)
+        ids, next_link = self.get_feed()
+        self.assertEqual(ids, expected[:1])
+        self.assertIn(f'before={expected[0]}', next_link)
+        ids, next_link = self.get_feed(next_link)
+        self.assertEqual(ids, expected[1:])
+        self.assertIsNone(next_link)
+
+    @override_settings(FEED_FANOUT_LIMIT=0)
+    def test_popular_author_is_merged_without_fan_out(self):
+        recipe = Recipe.objects.create(
+            name='Рецепт популярного автора',
+            text='Описание',
+            image='recipes/test.png',
+            cooking_time=10,
+            author=self.author
+        )
+        self.assertFalse(
+            TimelineEntry.objects.filter(recipe=recipe).exists()
+        )
+        self.client.force_authenticate(self.user)
+        ids, _ = self.get_feed()
+        self.assertEqual(ids, [recipe.id])
+
+
+class SearchTest(RecipeTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.by_name = Recipe.objects.create(
+            name='Борщ украинский',
+            text='Свекла и капуста',
+            image='recipes/test.png',
+            cooking_time=60,
+            author=cls.author
+        )
+        cls.by_text = Recipe.objects.create(
+            name='Обед',
+            text='Подается вместе с борщом',
+            image='recipes/test.png',
+            cooking_time=30,
+            author=cls.author
+        )
+
+    def search(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return [recipe['id'] for recipe in response.data['results']]
+
+    def test_orders_by_rank(self):
+        self.assertEqual(
+            self.search('/api/recipes/?search=борщ'),
+            [self.by_name.id, self.by_text.id]
+        )
+
+    def test_cursor_mode_keeps_rank(self):
+        self.assertEqual(
+            self.search('/api/recipes/?search=борщ&pagination=cursor'),
+            [self.by_name.id, self.by_text.id]
+        )
+
+
+class TokenCacheTest(RecipeTestCase):
+    def test_saving_cached_user_keeps_counters(self):
+        token = Token.objects.create(user=self.author)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        self.assertEqual(self.client.get('/api/users/me/').status_code, 200)
+        Subscribe.objects.filter(author=self.author).delete()
+        response = self.client.post(
+            '/api/users/set_password/',
+            {
+                'current_password': 'password-12345',
+                'new_password': 'new-password-67890'
+            }
+        )
+        self.assertEqual(response.status_code, 204)
+        self.author.refresh_from_db()
+        self.assertEqual(self.author.followers_count, 0)
+        self.assertEqual(self.author.recipes_count, 2)
+
+
+@override_settings(DATABASE_REPLICAS=[REPLICA])
+class ReplicaRoutingTest(TransactionTestCase):
+    databases = {DEFAULT_DB_ALIAS, REPLICA}
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='writer',
+            email='writer@example.com',
+            password='password-12345',
+            first_name='Имя',
+            last_name='Фамилия'
+        )
+        self.recipe = Recipe.objects.create(
+            name='Рецепт',
+            text='Описание',
+            image='recipes/test.png',
+            cooking_time=10,
+            author=self.user
+        )
+        token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+    def count_queries(self, method, url):
+        with CaptureQueriesContext(connections[DEFAULT_DB_ALIAS]) as primary:
+            with CaptureQueriesContext(connections[REPLICA]) as replica:
+                response = getattr(self.client, method)(url)
+        return response, len(primary), len(replica)
+
+    def test_router(self):
+        self.assertEqual(Recipe.objects.all().db, DEFAULT_DB_ALIAS)
+        previous = allow_replica_reads(True)
+        try:
+            self.assertEqual(Recipe.objects.all().db, REPLICA)
+            with transaction.atomic():
+                self.assertEqual(Recipe.objects.all().db, DEFAULT_DB_ALIAS)
+            self.user.save()
+            self.assertEqual(self.user._state.db, DEFAULT_DB_ALIAS)
+        finally:
+            allow_replica_reads(previous)
+
+    def test_safe_reads_use_replica(self):
+        self.client.credentials()
+        response, primary, replica = self.count_queries(
+            'get',
+            '/api/recipes/'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
+
+    def test_write_pins_reads_to_primary(self):
+        response, primary, replica = self.count_queries(
+            'post',
+            f'/api/recipes/{self.recipe.id}/favorite/'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(replica, 0)
+        self.assertIn('use_primary', response.cookies)
+        self.client.cookies.clear()
+        response, primary, replica = self.count_queries(
+            'get',
+            f'/api/recipes/{self.recipe.id}/'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['is_favorited'])
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
+
+
+class FavoriteAndCartTest(RecipeTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.user)
+        self.other = Recipe.objects.exclude(pk=self.recipe.pk).first()
+
+    def test_single_post(self):
+        url = f'/api/recipes/{self.other.id}/favorite/'
+        self.assertEqual(self.client.post(url).status_code, 201)
+        self.assertEqual(self.client.post(url).status_code, 400)
+        self.other.refresh_from_db()
+        self.assertEqual(self.other.favorites_count, 1)
+
+    def test_batch_add_and_remove(self):
+        url = '/api/recipes/shopping_cart/'
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                url,
+                {'recipes': [self.other.id, self.recipe.id, 999999]},
+                format='json'
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'], [
+            {'id': self.other.id, 'status': 'added'},
+            {'id': self.recipe.id, 'status': 'exists'},
+            {'id': 999999, 'status': 'not_found'},
+        ])
+        self.other.refresh_from_db()
+        self.assertEqual(self.other.in_carts_count, 1)
+        totals = dict(ShoppingTotal.objects.filter(
+            user=self.user
+        ).values_list('ingredient_id', 'amount'))
+        self.assertEqual(totals, dict(
+            IngredientAmount.objects.filter(
+                recipe__in=(self.recipe, self.other)
+            ).order_by().values('ingredient_id').annotate(
+                total=Sum('amount')
+            ).values_list('ingredient_id', 'total')
+        ))
+        detail = self.client.get(f'/api/recipes/{self.other.id}/')
+        self.assertTrue(detail.data['is_in_shopping_cart'])
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(
+                url,
+                {'recipes': [self.other.id, self.recipe.id, self.other.id]},
+                format='json'
+            )
+        self.assertEqual(response.data['results'], [
+            {'id': self.other.id, 'status': 'removed'},
+            {'id': self.recipe.id, 'status': 'removed'},
+        ])
+        self.assertFalse(
+            ShoppingTotal.objects.filter(user=self.user).exists()
+        )
+        self.other.refresh_from_db()
+        self.assertEqual(self.other.in_carts_count, 0)
+        detail = self.client.get(f'/api/recipes/{self.other.id}/')
+        self.assertFalse(detail.data['is_in_shopping_cart'])
+
+    def test_batch_validation(self):
+        url = '/api/recipes/favorite/'
+        response = self.client.post(url, {'recipes': []}, format='json')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(
+            url,
+            {'recipes': list(range(1, 102))},
+            format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.client.force_authenticate(None)
+        response = self.client.post(
+            url,
+            {'recipes': [self.recipe.id]},
+            format='json'
+        )
+        self.assertEqual(response.status_code, 401)
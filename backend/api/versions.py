@@ -0,0 +1,50 @@
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+RECIPES = 'recipes'
+TAGS = 'tags'
+INGREDIENTS = 'ingredients'
+
+
+def get_key(scope):
+    return f'version:{scope}'
+
+
+def get_user_scope(user_id):
+    return f'user:{user_id}'
+
+
+def get_cart_scope(user_id):
+    return f'cart:{user_id}'
+
+
+def get_membership_scope(kind, user_id):
+    return f'membership:{kind}:{user_id}'
+
+
+def get_version(scope):
+    return get_versions(scope)[0]
+
+
+def get_versions(*scopes):
+    keys = [get_key(scope) for scope in scopes]
+    found = cache.get_many(keys)
+    versions = []
+    for key in keys:
+        version = found.get(key)
+        if version is None:
+            version = time.time_ns()
+            if not cache.add(key, version, None):
+                version = cache.get(key, version)
+        versions.append(version)
+    return versions
+
+
+def bump_version(*scopes):
+    def bump():
+        version = time.time_ns()
+        cache.set_many({get_key(scope): version for scope in scopes}, None)
+
+    transaction.on_commit(bump)
@@ -1,28 +1,56 @@
-from django.db import models
-from django.db.models import OuterRef, Exists
-from django.http import FileResponse
+from django.db import transaction
+from django.db.models import Prefetch
+from django.http import HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
-from ..filters import RecipeFilter, IngredientFilter
+from ..filters import RecipeFilter
+from ..ingredient_index import get_index
+from ..membership import (
+    FAVORITE,
+    SHOPPING_CART,
+    add_recipes,
+    remove_recipes
+)
+from ..pagination import FeedPagination, RecipeCursorPagination
+from ..renderers import (
+    CSVShoppingListRenderer,
+    FormatNegotiation,
+    PDFShoppingListRenderer,
+    TextShoppingListRenderer
+)
+from ..catalog import catalog_response
+from ..conditional import conditional_get
+from ..response_cache import cache_anonymous_response
 from recipes.models import (
     Favorite,
     Ingredient,
+    IngredientAmount,
     Recipe,
     ShoppingCart,
+    ShoppingTotal,
     Tag
 )
+from recipes.timeline import get_feed_ids
+from users.models import User
 from ..serializers.recipes import (
     FavoriteSerializer,
     IngredientSerializer,
     RecipeGETSerializer,
     RecipeCreateSerializer,
+    RecipeIdsSerializer,
     ShoppingCartSerializer,
+    ShoppingTotalSerializer,
     TagSerializer
 )
-from ..services import get_shopping_list
+from ..services import (
+    annotate_is_subscribed,
+    get_cached_shopping_list,
+    stream_shopping_list
+)
+from ..versions import INGREDIENTS, RECIPES, TAGS
 
 
 class TagsModelViewSet(viewsets.ReadOnlyModelViewSet):
@@ -31,54 +59,95 @@ class TagsModelViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = (permissions.IsAuthenticatedOrReadOnly,)
     pagination_class = None
 
+    @conditional_get(TAGS, weak=True)
+    def list(self, request, *args, **kwargs):
+        return catalog_response(
+            request,
+            TAGS,
+            lambda: TagSerializer(Tag.objects.all(), many=True).data
+        )
+
+    @conditional_get(TAGS)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
 
 class IngredientsModelViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
     permission_classes = (permissions.IsAuthenticatedOrReadOnly,)
     pagination_class = None
-    filter_backends = [IngredientFilter, ]
-    search_fields = ['^name', ]
+
+    @conditional_get(INGREDIENTS, weak=True)
+    def list(self, request, *args, **kwargs):
+        name = request.query_params.get('name')
+        if name:
+            return Response(get_index().search(name))
+        return catalog_response(
+            request,
+            INGREDIENTS,
+            lambda: IngredientSerializer(
+                Ingredient.objects.all(),
+                many=True
+            ).data
+        )
+
+    @conditional_get(INGREDIENTS)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
 
 
 class RecipeModelViewSet(viewsets.ModelViewSet):
+    queryset = Recipe.objects.all()
     permission_classes = (permissions.IsAuthenticatedOrReadOnly,)
     filterset_class = RecipeFilter
 
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            if (
+                RecipeCursorPagination.is_requested(self.request)
+                and 'search' not in self.request.query_params
+            ):
+                self._paginator = RecipeCursorPagination()
+            else:
+                return super().paginator
+        return self._paginator
+
     def get_queryset(self):
-        queryset = (
-            Recipe
-            .objects
-            .select_related('author')
-            .prefetch_related('ingredients')
-        )
-        if self.request.user.is_authenticated:
-            favorited_subquery = Favorite.objects.filter(
-                user=self.request.user,
-                recipe=OuterRef('pk')
-            )
-            shopping_cart_subquery = ShoppingCart.objects.filter(
-                user=self.request.user,
-                recipe=OuterRef('pk')
-            )
-            queryset = queryset.annotate(
-                is_favorited=Exists(
-                    favorited_subquery,
-                    output_field=models.BooleanField()
-                ),
-                is_in_shopping_cart=Exists(
-                    shopping_cart_subquery,
-                    output_field=models.BooleanField()
+        return Recipe.objects.prefetch_related(
+            Prefetch(
+                'author',
+                queryset=annotate_is_subscribed(
+                    User.objects.all(),
+                    self.request.user
                 )
-            )
-            return queryset
-        return queryset
+            ),
+            Prefetch(
+                'IngredientAmount',
+                queryset=IngredientAmount.objects.select_related(
+                    'ingredient'
+                )
+            ),
+            'tags'
+        )
+
+    @conditional_get(RECIPES, per_user=True)
+    @cache_anonymous_response
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @conditional_get(RECIPES, per_user=True)
+    @cache_anonymous_response
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
 
     def get_serializer_class(self):
         if self.request.method == 'GET':
             return RecipeGETSerializer
         return RecipeCreateSerializer
 
+    @transaction.atomic
     def post_favorite_or_shopping_cart(self, request, serializer_class, pk):
         recipe = get_object_or_404(Recipe, pk=pk)
         user = request.user
@@ -97,6 +166,21 @@ class RecipeModelViewSet(viewsets.ModelViewSet):
             status=status.HTTP_201_CREATED
         )
 
+    def change_in_bulk(self, request, change, kind):
+        serializer = RecipeIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = change(
+            request.user.id,
+            kind,
+            list(dict.fromkeys(serializer.validated_data['recipes']))
+        )
+        return Response({
+            'results': [
+                {'id': recipe_id, 'status': result}
+                for recipe_id, result in results.items()
+            ]
+        })
+
     @action(
         detail=True,
         methods=['post'],
@@ -119,6 +203,20 @@ class RecipeModelViewSet(viewsets.ModelViewSet):
             recipe=recipe).delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+    @action(
+        detail=False,
+        methods=['post'],
+        url_path='favorite',
+        url_name='favorite-batch',
+        permission_classes=(permissions.IsAuthenticated,)
+    )
+    def favorite_batch(self, request):
+        return self.change_in_bulk(request, add_recipes, FAVORITE)
+
+    @favorite_batch.mapping.delete
+    def delete_favorite_batch(self, request):
+        return self.change_in_bulk(request, remove_recipes, FAVORITE)
+
     @action(
         detail=True,
         methods=['post'],
@@ -143,14 +241,74 @@ class RecipeModelViewSet(viewsets.ModelViewSet):
 
     @action(
         detail=False,
-        methods=['get'],
+        methods=['post'],
+        url_path='shopping_cart',
+        url_name='shopping-cart-batch',
         permission_classes=(permissions.IsAuthenticated,)
     )
+    def shopping_cart_batch(self, request):
+        return self.change_in_bulk(request, add_recipes, SHOPPING_CART)
+
+    @shopping_cart_batch.mapping.delete
+    def delete_shopping_cart_batch(self, request):
+        return self.change_in_bulk(request, remove_recipes, SHOPPING_CART)
+
+    @action(
+        detail=False,
+        methods=['get'],
+        permission_classes=(permissions.IsAuthenticated,),
+        renderer_classes=(
+            TextShoppingListRenderer,
+            CSVShoppingListRenderer,
+            PDFShoppingListRenderer
+        ),
+        content_negotiation_class=FormatNegotiation
+    )
     def download_shopping_cart(self, request):
-        if not request.user.shopping_cart.exists():
+        user = request.user
+        renderer = request.accepted_renderer
+        content = get_cached_shopping_list(user, renderer.format)
+        if content is None and not user.shopping_cart.exists():
             return Response(status=status.HTTP_400_BAD_REQUEST)
-        file = f'{request.user.username}_shopping_list'
-        response = get_shopping_list(request)
-        response = FileResponse(response, content_type='text/plain')
-        response['Content-Disposition'] = f'attachment; filename="{file}.txt"'
+        content_type = renderer.media_type
+        if renderer.charset:
+            content_type = f'{content_type}; charset={renderer.charset}'
+        if content is None:
+            response = StreamingHttpResponse(
+                stream_shopping_list(user, renderer.format),
+                content_type=content_type
+            )
+        else:
+            response = HttpResponse(content, content_type=content_type)
+        file = f'{user.username}_shopping_list.{renderer.format}'
+        response['Content-Disposition'] = f'attachment; filename="{file}"'
         return response
+
+    @action(
+        detail=False,
+        methods=['get'],
+        permission_classes=(permissions.IsAuthenticated,)
+    )
+    def shopping_totals(self, request):
+        queryset = ShoppingTotal.objects.filter(
+            user=request.user
+        ).select_related('ingredient').order_by('ingredient__name')
+        serializer = ShoppingTotalSerializer(queryset, many=True)
+        return Response(serializer.data)
+
+    @action(
+        detail=False,
+        methods=['get'],
+        permission_classes=(permissions.IsAuthenticated,)
+    )
+    def feed(self, request):
+        paginator = FeedPagination()
+        recipe_ids = paginator.paginate_ids(
+            lambda before, limit: get_feed_ids(request.user, before, limit),
+            request
+        )
+        serializer = self.get_serializer(
+            self.get_queryset().filter(id__in=recipe_ids),
+            many=True
+        )
+        return paginator.get_paginated_response(serializer.data)
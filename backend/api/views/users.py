@@ -1,3 +1,4 @@
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 from djoser.views import UserViewSet
 from rest_framework import permissions, status
@@ -8,6 +9,11 @@ from ..serializers.users import (
     UserSerializer,
     SubscribeSerializer
 )
+from ..services import (
+    annotate_is_subscribed,
+    get_recipes_limit,
+    prefetch_limited_recipes
+)
 from users.models import (
     Subscribe,
     User
@@ -19,8 +25,15 @@ class CustomUserViewSet(UserViewSet):
     serializer_class = UserSerializer
     permission_classes = (permissions.IsAuthenticatedOrReadOnly,)
 
+    def get_queryset(self):
+        return annotate_is_subscribed(
+            super().get_queryset(),
+            self.request.user
+        )
+
     @action(detail=True, methods=['post'],
             permission_classes=(permissions.IsAuthenticated,))
+    @transaction.atomic
     def subscribe(self, request, id):
         author = get_object_or_404(User, id=id)
         follow = request.user
@@ -53,8 +66,12 @@ class CustomUserViewSet(UserViewSet):
     @action(detail=False, methods=['get'],
             permission_classes=(permissions.IsAuthenticated,))
     def subscriptions(self, request):
-        authors = User.objects.filter(author__follow=request.user)
+        authors = annotate_is_subscribed(
+            User.objects.filter(author__follow=request.user),
+            request.user
+        )
         result_pages = self.paginate_queryset(authors)
+        prefetch_limited_recipes(result_pages, get_recipes_limit(request))
         serializer = SubscribeSerializer(
             result_pages,
             many=True,
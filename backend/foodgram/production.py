@@ -0,0 +1,23 @@
+from django.core.exceptions import ImproperlyConfigured
+
+from .settings import *  # noqa: F401,F403
+from .settings import CACHES, INSTALLED_APPS, MIDDLEWARE
+
+DEBUG = False
+
+DEV_APPS = ('debug_toolbar',)
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in DEV_APPS]
+MIDDLEWARE = [
+    middleware for middleware in MIDDLEWARE
+    if middleware.split('.')[0] not in DEV_APPS
+]
+
+LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.dummy.DummyCache',
+    'django.core.cache.backends.locmem.LocMemCache',
+)
+if CACHES['default']['BACKEND'] in LOCAL_CACHE_BACKENDS:
+    raise ImproperlyConfigured(
+        'CACHE_BACKEND должен быть общим для всех процессов, '
+        'например PyMemcacheCache'
+    )
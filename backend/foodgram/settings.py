@@ -18,12 +18,12 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 
     'rest_framework',
     'rest_framework.authtoken',
     'djoser',
     'django_filters',
-    'debug_toolbar',
 
     'api.apps.ApiConfig',
     'recipes.apps.RecipesConfig',
@@ -32,6 +32,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.MetricsMiddleware',
+    'api.middleware.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -39,9 +41,13 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'debug_toolbar.middleware.DebugToolbarMiddleware',
 ]
 
+if DEBUG:
+    INSTALLED_APPS.append('debug_toolbar')
+    MIDDLEWARE.append('debug_toolbar.middleware.DebugToolbarMiddleware')
+    INTERNAL_IPS = ['127.0.0.1']
+
 ROOT_URLCONF = 'foodgram.urls'
 
 TEMPLATES = [
@@ -69,7 +75,34 @@ DATABASES = {
         'USER': os.getenv('POSTGRES_USER', default='django'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', default='django'),
         'HOST': os.getenv('DB_HOST', default='localhost'),
-        'PORT': os.getenv('DB_PORT', default=5432)
+        'PORT': os.getenv('DB_PORT', default=5432),
+        'CONN_MAX_AGE': int(os.getenv('CONN_MAX_AGE', 60)),
+    }
+}
+DB_MAX_CONNECTIONS = int(os.getenv('DB_MAX_CONNECTIONS', 100))
+DB_RESERVED_CONNECTIONS = int(os.getenv('DB_RESERVED_CONNECTIONS', 10))
+DB_CONNECTION_BUDGET = DB_MAX_CONNECTIONS - DB_RESERVED_CONNECTIONS
+
+DATABASE_REPLICAS = []
+for index, host in enumerate(os.getenv('DB_REPLICA_HOSTS', '').split()):
+    alias = f'replica_{index}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['api.replicas.ReplicaRouter']
+REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', 5))
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            default='django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', default='foodgram'),
     }
 }
 
@@ -107,6 +140,20 @@ MEDIA_ROOT = '/app/media/'
 
 CSV_FILES_DIR = BASE_DIR / 'data'
 
+RECIPE_IMAGE_VARIANTS = {
+    'card': (480, 480),
+    'detail': (1200, 1200),
+}
+RECIPE_IMAGE_QUALITY = 80
+
+TOKEN_CACHE_TIMEOUT = 60 * 5
+TOKEN_CACHE_LOCAL_TIMEOUT = 10
+TOKEN_CACHE_LOCAL_SIZE = 10000
+
+FEED_FANOUT_LIMIT = 1000
+FEED_FANOUT_BATCH_SIZE = 1000
+FEED_BACKFILL_SIZE = 100
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
@@ -115,7 +162,7 @@ REST_FRAMEWORK = {
     ],
 
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'api.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
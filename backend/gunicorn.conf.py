@@ -0,0 +1,92 @@
+import gc
+import multiprocessing
+import os
+import shutil
+
+import psycopg2
+from prometheus_client import multiprocess
+
+from foodgram import settings
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+preload_app = os.getenv('GUNICORN_PRELOAD', 'True') == 'True'
+threads = int(os.getenv('GUNICORN_THREADS', 1))
+requested_workers = int(os.getenv(
+    'GUNICORN_WORKERS',
+    multiprocessing.cpu_count() * 2 + 1
+))
+workers = max(
+    1,
+    min(requested_workers, settings.DB_CONNECTION_BUDGET // threads)
+)
+
+
+def get_server_max_connections():
+    database = settings.DATABASES['default']
+    connection = psycopg2.connect(
+        dbname=database['NAME'],
+        user=database['USER'],
+        password=database['PASSWORD'],
+        host=database['HOST'],
+        port=database['PORT'],
+        connect_timeout=5,
+    )
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SHOW max_connections')
+            return int(cursor.fetchone()[0])
+    finally:
+        connection.close()
+
+
+def on_starting(server):
+    metrics_dir = os.getenv('PROMETHEUS_MULTIPROC_DIR')
+    if metrics_dir:
+        shutil.rmtree(metrics_dir, ignore_errors=True)
+        os.makedirs(metrics_dir)
+
+
+def child_exit(server, worker):
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        multiprocess.mark_process_dead(worker.pid)
+
+
+def when_ready(server):
+    log = server.log
+    if preload_app:
+        from django.db import connections
+
+        connections.close_all()
+        gc.freeze()
+    pool_size = workers * threads
+    if workers < requested_workers:
+        log.warning(
+            'Workers reduced from %s to %s to fit %s database connections',
+            requested_workers,
+            workers,
+            settings.DB_CONNECTION_BUDGET
+        )
+    log.info(
+        'Database pool: %s workers x %s threads = %s connections per '
+        'database, budget %s, CONN_MAX_AGE %s, aliases %s',
+        workers,
+        threads,
+        pool_size,
+        settings.DB_CONNECTION_BUDGET,
+        settings.DATABASES['default']['CONN_MAX_AGE'],
+        ', '.join(settings.DATABASES)
+    )
+    try:
+        max_connections = get_server_max_connections()
+    except psycopg2.Error as error:
+        log.warning('Database pool self-check failed: %s', error)
+        return
+    available = max_connections - settings.DB_RESERVED_CONNECTIONS
+    if pool_size > available:
+        log.error(
+            'Database pool needs %s connections, server allows %s '
+            'after %s reserved',
+            pool_size,
+            available,
+            settings.DB_RESERVED_CONNECTIONS
+        )
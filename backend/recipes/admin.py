@@ -6,7 +6,8 @@ from .models import (
     Recipe,
     IngredientAmount,
     Favorite,
-    ShoppingCart
+    ShoppingCart,
+    ShoppingTotal
 )
 
 
@@ -44,7 +45,7 @@ class RecipeAdmin(admin.ModelAdmin):
     ]
 
     def favorited(self, object):
-        return Favorite.objects.filter(recipe=object).count()
+        return object.favorites_count
 
     favorited.short_description = 'В избранном'
 
@@ -53,3 +54,4 @@ admin.site.register(Tag)
 admin.site.register(Favorite)
 admin.site.register(ShoppingCart)
 admin.site.register(IngredientAmount)
+admin.site.register(ShoppingTotal)
@@ -0,0 +1,39 @@
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+
+def change_counter(model, pk, field, delta):
+    change_counters(model, [pk], field, delta)
+
+
+def change_counters(model, pks, field, delta):
+    if delta > 0:
+        value = F(field) + delta
+    else:
+        value = Greatest(F(field) + delta, Value(0))
+    model.objects.filter(pk__in=pks).update(**{field: value})
+
+
+def count_related(related_model, field):
+    return Coalesce(
+        Subquery(
+            related_model.objects.filter(
+                **{field: OuterRef('pk')}
+            ).order_by().values(field).annotate(
+                total=Count('pk')
+            ).values('total')
+        ),
+        Value(0)
+    )
+
+
+def repair_counter(model, counter, related_model, field, dry_run=False):
+    actual = count_related(related_model, field)
+    drifted = model.objects.annotate(actual=actual).exclude(
+        **{counter: F('actual')}
+    )
+    if dry_run:
+        return drifted.count()
+    return model.objects.filter(
+        pk__in=drifted.values('pk')
+    ).update(**{counter: actual})
@@ -0,0 +1,85 @@
+import io
+import logging
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+
+from .models import Recipe
+
+logger = logging.getLogger(__name__)
+
+FORMATS = (
+    ('JPEG', 'jpg', ''),
+    ('WEBP', 'webp', '_webp'),
+)
+VARIANTS_DIR = 'recipes/variants'
+
+
+def get_variant_names():
+    return [
+        f'{name}{suffix}'
+        for name in settings.RECIPE_IMAGE_VARIANTS
+        for _, _, suffix in FORMATS
+    ]
+
+
+def open_rgb(file):
+    from PIL import Image, ImageOps
+
+    with Image.open(file) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.mode in ('RGBA', 'LA', 'P'):
+            image = image.convert('RGBA')
+            background = Image.new('RGB', image.size, 'white')
+            background.paste(image, mask=image.getchannel('A'))
+            return background
+        return image.convert('RGB')
+
+
+def build_variants(image_name):
+    from PIL import Image
+
+    stem = PurePosixPath(image_name).stem
+    variants = {}
+    with default_storage.open(image_name) as file:
+        original = open_rgb(file)
+    for name, size in settings.RECIPE_IMAGE_VARIANTS.items():
+        image = original.copy()
+        image.thumbnail(size, Image.LANCZOS)
+        for image_format, extension, suffix in FORMATS:
+            buffer = io.BytesIO()
+            image.save(
+                buffer,
+                image_format,
+                quality=settings.RECIPE_IMAGE_QUALITY,
+                optimize=True
+            )
+            path = f'{VARIANTS_DIR}/{stem}_{name}.{extension}'
+            if default_storage.exists(path):
+                default_storage.delete(path)
+            variants[f'{name}{suffix}'] = default_storage.save(
+                path,
+                ContentFile(buffer.getvalue())
+            )
+    return variants
+
+
+def process_recipe_image(recipe_id, image_name):
+    try:
+        variants = build_variants(image_name)
+    except (OSError, ValueError):
+        logger.exception('Не удалось обработать фото %s', image_name)
+        variants = {name: image_name for name in get_variant_names()}
+    with transaction.atomic():
+        recipe = Recipe.objects.select_for_update().filter(
+            pk=recipe_id,
+            image=image_name
+        ).first()
+        if recipe is None:
+            return False
+        recipe.image_variants = variants
+        recipe.save(update_fields=['image_variants'])
+    return True
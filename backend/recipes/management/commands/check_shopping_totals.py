@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from recipes.models import ShoppingTotal
+from recipes.totals import get_carted_source, rebuild_totals
+
+
+class Command(BaseCommand):
+    help = 'Сверяет итоги списков покупок с агрегатом по корзинам'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fix',
+            action='store_true',
+            help='Пересобрать итоги пользователей с расхождениями',
+        )
+
+    def handle(self, *args, **options):
+        expected = {
+            (row['total_user'], row['total_ingredient']): row['total_amount']
+            for row in get_carted_source().iterator()
+        }
+        actual = {
+            (user_id, ingredient_id): amount
+            for user_id, ingredient_id, amount in (
+                ShoppingTotal.objects.values_list(
+                    'user_id',
+                    'ingredient_id',
+                    'amount'
+                ).iterator()
+            )
+        }
+        drifted = {
+            key for key in expected.keys() | actual.keys()
+            if expected.get(key) != actual.get(key)
+        }
+        user_ids = sorted({user_id for user_id, _ in drifted})
+        for user_id, ingredient_id in sorted(drifted):
+            self.stdout.write(
+                f'Пользователь {user_id}, ингредиент {ingredient_id}: '
+                f'ожидалось {expected.get((user_id, ingredient_id), 0)}, '
+                f'в таблице {actual.get((user_id, ingredient_id), 0)}'
+            )
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS('Расхождений нет'))
+            return
+        if options['fix']:
+            with transaction.atomic():
+                rebuild_totals(user_ids)
+            self.stdout.write(self.style.SUCCESS(
+                f'Пересобраны итоги пользователей: {len(user_ids)}'
+            ))
+        else:
+            self.stdout.write(self.style.WARNING(
+                f'Расхождений: {len(drifted)}, '
+                f'пользователей: {len(user_ids)}'
+            ))
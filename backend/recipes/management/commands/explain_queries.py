@@ -0,0 +1,152 @@
+import json
+from pathlib import Path
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from rest_framework.test import APIClient
+
+from recipes.models import Recipe, Tag
+from recipes.utils import QueryRecorder
+from users.models import User
+
+ENDPOINTS = (
+    ('recipes', '/api/recipes/', False),
+    ('recipes_cursor', '/api/recipes/?pagination=cursor', False),
+    ('recipes_author', '/api/recipes/?author={user}', False),
+    ('recipes_tags', '/api/recipes/?tags={tag}', False),
+    ('recipes_search', '/api/recipes/?search={search}', False),
+    ('recipe', '/api/recipes/{recipe}/', False),
+    ('tags', '/api/tags/', False),
+    ('ingredients', '/api/ingredients/', False),
+    ('users', '/api/users/', True),
+    ('user', '/api/users/{user}/', True),
+    ('subscriptions', '/api/users/subscriptions/', True),
+    ('favorites', '/api/recipes/?is_favorited=1', True),
+    ('shopping_cart', '/api/recipes/?is_in_shopping_cart=1', True),
+    ('feed', '/api/recipes/feed/', True),
+    ('shopping_totals', '/api/recipes/shopping_totals/', True),
+    ('download_shopping_cart', '/api/recipes/download_shopping_cart/', True),
+)
+
+LOCAL_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'explain_queries',
+    }
+}
+
+
+def iter_nodes(plan):
+    yield plan
+    for child in plan.get('Plans', ()):
+        yield from iter_nodes(child)
+
+
+class Command(BaseCommand):
+    help = 'Проверяет планы запросов API на последовательные сканирования'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-rows',
+            type=int,
+            default=10000,
+            help='Seq Scan допустим по таблицам меньше этого числа строк',
+        )
+        parser.add_argument(
+            '--baseline',
+            help='JSON со стоимостью запросов каждого эндпоинта',
+        )
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=0.2,
+            help='Допустимый рост стоимости относительно baseline',
+        )
+        parser.add_argument(
+            '--update-baseline',
+            action='store_true',
+            help='Записать текущие стоимости в файл baseline',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Команда работает только с PostgreSQL')
+        recipe = Recipe.objects.order_by('-id').first()
+        if recipe is None:
+            raise CommandError('Нет рецептов для проверки')
+        params = {
+            'recipe': recipe.id,
+            'user': recipe.author_id,
+            'tag': Tag.objects.values_list('slug', flat=True).first(),
+            'search': recipe.name.split()[0],
+        }
+        user = User.objects.filter(
+            follow__isnull=False
+        ).first() or recipe.author
+        baseline_path = options['baseline'] and Path(options['baseline'])
+        baseline = {}
+        if baseline_path and baseline_path.exists():
+            baseline = json.loads(baseline_path.read_text())
+        costs = {}
+        problems = []
+        for name, url, private in ENDPOINTS:
+            client = APIClient()
+            if private:
+                client.force_authenticate(user)
+            queries = self.capture(client, url.format(**params))
+            cost = 0
+            for sql, query_params in queries:
+                plan = self.explain(sql, query_params)
+                cost += plan['Total Cost']
+                for table in self.get_seq_scans(plan, options['min_rows']):
+                    problems.append(f'{name}: Seq Scan по {table}')
+            costs[name] = round(cost, 2)
+            expected = baseline.get(name)
+            if expected and cost > expected * (1 + options['tolerance']):
+                problems.append(
+                    f'{name}: стоимость {cost:.2f}, в baseline {expected}'
+                )
+            self.stdout.write(
+                f'{name}: запросов {len(queries)}, стоимость {cost:.2f}'
+            )
+        if options['update_baseline'] and baseline_path:
+            baseline_path.write_text(json.dumps(costs, indent=2) + '\n')
+            self.stdout.write(f'Baseline записан в {baseline_path}')
+        if problems:
+            raise CommandError('\n'.join(problems))
+        self.stdout.write(self.style.SUCCESS('Регрессий в планах нет'))
+
+    def capture(self, client, url):
+        recorder = QueryRecorder()
+        with override_settings(ALLOWED_HOSTS=['*'], CACHES=LOCAL_CACHES):
+            cache.clear()
+            with connection.execute_wrapper(recorder):
+                response = client.get(url)
+                if response.streaming:
+                    b''.join(response.streaming_content)
+        if response.status_code >= 500:
+            raise CommandError(f'{url}: {response.status_code}')
+        return [
+            (sql, params) for sql, params in recorder.queries
+            if sql.lstrip().upper().startswith(('SELECT', 'WITH'))
+        ]
+
+    def explain(self, sql, params):
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            return cursor.fetchone()[0][0]['Plan']
+
+    def get_seq_scans(self, plan, min_rows):
+        with connection.cursor() as cursor:
+            for node in iter_nodes(plan):
+                if node['Node Type'] != 'Seq Scan':
+                    continue
+                cursor.execute(
+                    'SELECT reltuples FROM pg_class WHERE relname = %s',
+                    [node['Relation Name']]
+                )
+                row = cursor.fetchone()
+                if row and row[0] >= min_rows:
+                    yield node['Relation Name']
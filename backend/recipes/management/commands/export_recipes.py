@@ -0,0 +1,84 @@
+import json
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+
+from recipes.models import IngredientAmount, Recipe
+from recipes.utils import batched
+
+
+class Command(BaseCommand):
+    help = 'Выгружает рецепты в NDJSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            default='-',
+            help='Файл для выгрузки, по умолчанию stdout',
+        )
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def get_ingredients(self, recipe_ids):
+        ingredients = defaultdict(list)
+        rows = IngredientAmount.objects.filter(
+            recipe_id__in=recipe_ids
+        ).order_by('recipe_id', 'id').values_list(
+            'recipe_id',
+            'ingredient__name',
+            'ingredient__measurement_unit',
+            'amount'
+        )
+        for recipe_id, name, unit, amount in rows:
+            ingredients[recipe_id].append({
+                'name': name,
+                'measurement_unit': unit,
+                'amount': amount,
+            })
+        return ingredients
+
+    def get_tags(self, recipe_ids):
+        tags = defaultdict(list)
+        rows = Recipe.tags.through.objects.filter(
+            recipe_id__in=recipe_ids
+        ).order_by('recipe_id', 'tag__slug').values_list(
+            'recipe_id',
+            'tag__slug'
+        )
+        for recipe_id, slug in rows:
+            tags[recipe_id].append(slug)
+        return tags
+
+    def export(self, output, chunk_size):
+        recipes = Recipe.objects.order_by('id').values_list(
+            'id',
+            'name',
+            'text',
+            'cooking_time',
+            'image',
+            'author__email'
+        ).iterator(chunk_size=chunk_size)
+        total = 0
+        for chunk in batched(recipes, chunk_size):
+            recipe_ids = [row[0] for row in chunk]
+            ingredients = self.get_ingredients(recipe_ids)
+            tags = self.get_tags(recipe_ids)
+            for recipe_id, name, text, cooking_time, image, author in chunk:
+                output.write(json.dumps({
+                    'name': name,
+                    'text': text,
+                    'cooking_time': cooking_time,
+                    'image': image,
+                    'author': author,
+                    'tags': tags[recipe_id],
+                    'ingredients': ingredients[recipe_id],
+                }, ensure_ascii=False) + '\n')
+            total += len(chunk)
+        return total
+
+    def handle(self, *args, **options):
+        if options['output'] == '-':
+            total = self.export(self.stdout, options['chunk_size'])
+        else:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                total = self.export(output, options['chunk_size'])
+        self.stderr.write(self.style.SUCCESS(f'Выгружено рецептов: {total}'))
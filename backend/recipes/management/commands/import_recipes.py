@@ -0,0 +1,113 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from api.versions import RECIPES, bump_version
+from recipes.counters import repair_counter
+from recipes.models import Ingredient, IngredientAmount, Recipe, Tag
+from recipes.timeline import fan_out_recipes
+from recipes.utils import batched
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = 'Загружает рецепты из NDJSON, выгруженного export_recipes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--input',
+            default='-',
+            help='Файл с рецептами, по умолчанию stdin',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def build(self, record, authors):
+        author_id = authors.get(record['author'])
+        if author_id is None:
+            raise KeyError(f'автор {record["author"]}')
+        ingredients = []
+        for item in record['ingredients']:
+            key = (item['name'], item['measurement_unit'])
+            if key not in self.ingredients:
+                raise KeyError(f'ингредиент {key[0]}, {key[1]}')
+            ingredients.append((self.ingredients[key], item['amount']))
+        tags = []
+        for slug in record['tags']:
+            if slug not in self.tags:
+                raise KeyError(f'тег {slug}')
+            tags.append(self.tags[slug])
+        recipe = Recipe(
+            author_id=author_id,
+            name=record['name'],
+            text=record['text'],
+            cooking_time=record['cooking_time'],
+            image=record['image'],
+        )
+        return recipe, ingredients, tags
+
+    @transaction.atomic
+    def import_batch(self, lines, start):
+        records = [json.loads(line) for line in lines if line.strip()]
+        authors = dict(User.objects.filter(
+            email__in={record['author'] for record in records}
+        ).values_list('email', 'id'))
+        built = []
+        for number, record in enumerate(records, start):
+            try:
+                built.append(self.build(record, authors))
+            except KeyError as error:
+                self.stderr.write(self.style.WARNING(
+                    f'Строка {number}: не найден {error.args[0]}'
+                ))
+        recipes = Recipe.objects.bulk_create(
+            [recipe for recipe, _, _ in built]
+        )
+        IngredientAmount.objects.bulk_create([
+            IngredientAmount(
+                recipe_id=recipe.id,
+                ingredient_id=ingredient_id,
+                amount=amount
+            )
+            for recipe, (_, ingredients, _) in zip(recipes, built)
+            for ingredient_id, amount in ingredients
+        ])
+        Recipe.tags.through.objects.bulk_create([
+            Recipe.tags.through(recipe_id=recipe.id, tag_id=tag_id)
+            for recipe, (_, _, tags) in zip(recipes, built)
+            for tag_id in tags
+        ])
+        fan_out_recipes([recipe.id for recipe in recipes])
+        return len(recipes)
+
+    def import_lines(self, lines, batch_size):
+        total = 0
+        start = 1
+        for batch in batched(lines, batch_size):
+            total += self.import_batch(batch, start)
+            start += len(batch)
+        return total
+
+    def handle(self, *args, **options):
+        if not connection.features.can_return_rows_from_bulk_insert:
+            raise CommandError(
+                'Импорт требует базы, возвращающей id из bulk_create'
+            )
+        self.ingredients = {
+            (name, unit): id
+            for id, name, unit in Ingredient.objects.values_list(
+                'id',
+                'name',
+                'measurement_unit'
+            ).iterator()
+        }
+        self.tags = dict(Tag.objects.values_list('slug', 'id'))
+        if options['input'] == '-':
+            total = self.import_lines(sys.stdin, options['batch_size'])
+        else:
+            with open(options['input'], encoding='utf-8') as lines:
+                total = self.import_lines(lines, options['batch_size'])
+        repair_counter(User, 'recipes_count', Recipe, 'author')
+        bump_version(RECIPES)
+        self.stdout.write(self.style.SUCCESS(f'Загружено рецептов: {total}'))
@@ -0,0 +1 @@
+from .load_ingridients import Command  # noqa: F401
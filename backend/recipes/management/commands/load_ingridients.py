@@ -1,33 +1,112 @@
 import csv
+import json
+import time
 
-from django.core.management.base import BaseCommand
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
 
+from api.versions import INGREDIENTS, TAGS, bump_version
 from recipes.models import Ingredient, Tag
+from recipes.utils import batched
+
+TAGS_DATA = (
+    ('Завтрак', 'breakfast', '#FFFC66'),
+    ('Обед', 'lunch', '#54E709'),
+    ('Ужин', 'dinner', '#E4007C'),
+)
+
+
+def read_csv(path):
+    with open(path, encoding='utf-8', newline='') as fixture:
+        for row in csv.reader(fixture):
+            if row:
+                yield row[0].strip(), row[1].strip()
+
+
+def read_json(path):
+    with open(path, encoding='utf-8') as fixture:
+        for item in json.load(fixture):
+            yield item['name'].strip(), item['measurement_unit'].strip()
 
 
 class Command(BaseCommand):
-    def handle(self, *args, **options):
-        self.stdout.write(self.style.WARNING('Загружаются тэги'))
-        Tag.objects.get_or_create(
-            name='Завтрак',
-            slug='breakfast',
-            color='#FFFC66'
+    help = 'Загружает теги и ингредиенты из CSV или JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default=settings.CSV_FILES_DIR / 'ingredients.csv',
+            help='Файл с ингредиентами (.csv или .json)',
         )
-        Tag.objects.get_or_create(
-            name='Обед',
-            slug='lunch',
-            color='#54E709'
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Показать новые ингредиенты, ничего не записывая',
         )
-        Tag.objects.get_or_create(
-            name='Ужин',
-            slug='dinner',
-            color='#E4007C'
+
+    def get_reader(self, path):
+        suffix = str(path).rsplit('.', 1)[-1].lower()
+        if suffix == 'csv':
+            return read_csv(path)
+        if suffix == 'json':
+            return read_json(path)
+        raise CommandError(f'Неизвестный формат файла: {path}')
+
+    def load_tags(self, dry_run):
+        self.stdout.write(self.style.WARNING('Загружаются тэги'))
+        if dry_run:
+            return
+        Tag.objects.bulk_create(
+            [
+                Tag(name=name, slug=slug, color=color)
+                for name, slug, color in TAGS_DATA
+            ],
+            ignore_conflicts=True
         )
+        bump_version(TAGS)
+
+    def diff_batch(self, batch):
+        existing = set(
+            Ingredient.objects.filter(
+                name__in={name for name, _ in batch}
+            ).values_list('name', 'measurement_unit')
+        )
+        new = [row for row in dict.fromkeys(batch) if row not in existing]
+        for name, unit in new:
+            self.stdout.write(f'+ {name}, {unit}')
+        return len(new)
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        self.load_tags(dry_run)
         self.stdout.write(self.style.WARNING('Загружаются ингредиенты'))
-        with open('data/ingredients.csv',
-                  encoding='utf-8') as fixture:
-            reader = csv.reader(fixture)
-            for row in reader:
-                name, unit = row
-                Ingredient.objects.get_or_create(name=name,
-                                                 measurement_unit=unit)
+        reader = self.get_reader(options['path'])
+        started = time.perf_counter()
+        total = 0
+        new = 0
+        before = Ingredient.objects.count()
+        try:
+            for batch in batched(reader, options['batch_size']):
+                total += len(batch)
+                if dry_run:
+                    new += self.diff_batch(batch)
+                    continue
+                Ingredient.objects.bulk_create(
+                    [
+                        Ingredient(name=name, measurement_unit=unit)
+                        for name, unit in batch
+                    ],
+                    batch_size=options['batch_size'],
+                    ignore_conflicts=True
+                )
+        except OSError as error:
+            raise CommandError(error)
+        if not dry_run:
+            new = Ingredient.objects.count() - before
+            bump_version(INGREDIENTS)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Строк: {total}, новых: {new}, '
+            f'{total / elapsed if elapsed else total:.0f} строк/с'
+        ))
@@ -0,0 +1,55 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from recipes.images import process_recipe_image
+from recipes.models import Recipe
+
+
+def process(recipe):
+    try:
+        return process_recipe_image(*recipe)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = 'Готовит уменьшенные копии фото рецептов'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2)
+        parser.add_argument('--batch-size', type=int, default=20)
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5,
+            help='Пауза в секундах, когда очередь пуста',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Обработать очередь и завершиться',
+        )
+
+    def get_pending(self, batch_size):
+        return list(
+            Recipe.objects.filter(image_variants={}).exclude(
+                image=''
+            ).order_by('id').values_list('id', 'image')[:batch_size]
+        )
+
+    def handle(self, *args, **options):
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            while True:
+                pending = self.get_pending(options['batch_size'])
+                if pending:
+                    processed = sum(pool.map(process, pending))
+                    self.stdout.write(
+                        f'Обработано фото: {processed} из {len(pending)}'
+                    )
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
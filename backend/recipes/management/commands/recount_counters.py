@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from recipes.counters import repair_counter
+from recipes.models import Favorite, Recipe, ShoppingCart
+from users.models import Subscribe, User
+
+COUNTERS = (
+    (Recipe, 'favorites_count', Favorite, 'recipe'),
+    (Recipe, 'in_carts_count', ShoppingCart, 'recipe'),
+    (User, 'recipes_count', Recipe, 'author'),
+    (User, 'followers_count', Subscribe, 'author'),
+)
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает денормализованные счётчики и исправляет расхождения'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только показать количество расхождений',
+        )
+
+    def handle(self, *args, **options):
+        for model, counter, related_model, field in COUNTERS:
+            drifted = repair_counter(
+                model,
+                counter,
+                related_model,
+                field,
+                dry_run=options['dry_run']
+            )
+            style = self.style.WARNING if drifted else self.style.SUCCESS
+            self.stdout.write(style(
+                f'{model.__name__}.{counter}: расхождений {drifted}'
+            ))
@@ -0,0 +1,113 @@
+import json
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from api.urls import router
+from recipes.utils import QueryRecorder
+from users.models import User
+
+
+def get_routes():
+    for prefix, viewset, basename in router.registry:
+        yield f'{basename}-list', reverse(f'{basename}-list')
+        instance = viewset.queryset.order_by('-id').first()
+        if instance is not None:
+            yield f'{basename}-detail', reverse(
+                f'{basename}-detail',
+                args=[instance.pk]
+            )
+        for extra_action in viewset.get_extra_actions():
+            if extra_action.detail or 'get' not in extra_action.mapping:
+                continue
+            name = f'{basename}-{extra_action.url_name}'
+            yield name, reverse(name)
+
+
+class Command(BaseCommand):
+    help = 'Замеряет задержку, число запросов и размер ответов API'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument(
+            '--user',
+            help='Email пользователя, от имени которого идут запросы',
+        )
+        parser.add_argument(
+            '--anonymous',
+            action='store_true',
+            help='Выполнять запросы без авторизации',
+        )
+        parser.add_argument('--output', help='Файл для JSON с результатами')
+
+    def get_client(self, options):
+        client = APIClient(raise_request_exception=False)
+        if options['anonymous']:
+            return client
+        users = User.objects.order_by('-followers_count', 'id')
+        if options['user']:
+            users = users.filter(email=options['user'])
+        user = users.filter(follow__isnull=False).first() or users.first()
+        if user is None:
+            raise CommandError('Нет пользователя для запросов')
+        client.force_authenticate(user)
+        return client
+
+    def request(self, client, url):
+        started = time.perf_counter()
+        response = client.get(url)
+        if response.streaming:
+            content = b''.join(response.streaming_content)
+        else:
+            content = response.content
+        return time.perf_counter() - started, response, len(content)
+
+    def measure(self, client, url, iterations, warmup):
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            _, response, size = self.request(client, url)
+        for _ in range(warmup):
+            self.request(client, url)
+        timings = [
+            self.request(client, url)[0] * 1000 for _ in range(iterations)
+        ]
+        percentiles = statistics.quantiles(
+            timings,
+            n=100,
+            method='inclusive'
+        )
+        return {
+            'url': url,
+            'status': response.status_code,
+            'p50_ms': round(percentiles[49], 2),
+            'p95_ms': round(percentiles[94], 2),
+            'p99_ms': round(percentiles[98], 2),
+            'queries': len(recorder.queries),
+            'bytes': size,
+        }
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 2:
+            raise CommandError('Нужно не меньше двух итераций')
+        client = self.get_client(options)
+        results = {}
+        with override_settings(ALLOWED_HOSTS=['*']):
+            for name, url in get_routes():
+                results[name] = self.measure(
+                    client,
+                    url,
+                    options['iterations'],
+                    options['warmup']
+                )
+        report = json.dumps(results, indent=2, ensure_ascii=False)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                output.write(report + '\n')
+        else:
+            self.stdout.write(report)
@@ -0,0 +1,219 @@
+import random
+import time
+import uuid
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from api.versions import INGREDIENTS, RECIPES, TAGS, bump_version
+from recipes.counters import repair_counter
+from recipes.models import (
+    Favorite,
+    Ingredient,
+    IngredientAmount,
+    Recipe,
+    ShoppingCart,
+    Tag
+)
+from recipes.timeline import fill_timelines
+from recipes.totals import rebuild_totals
+from users.models import Subscribe, User
+from .recount_counters import COUNTERS
+
+WORDS = (
+    'суп', 'салат', 'пирог', 'каша', 'рагу', 'запеканка', 'омлет', 'блины',
+    'борщ', 'плов', 'котлеты', 'паста', 'соус', 'десерт', 'жаркое', 'уха',
+)
+TAGS_DATA = (
+    ('Завтрак', '#E26C2D', 'breakfast'),
+    ('Обед', '#49B64E', 'lunch'),
+    ('Ужин', '#8775D2', 'dinner'),
+)
+
+
+class Skewed:
+    def __init__(self, rng, population, exponent):
+        self.rng = rng
+        self.population = list(population)
+        rng.shuffle(self.population)
+        self.cum_weights = list(accumulate(
+            1 / rank ** exponent
+            for rank in range(1, len(self.population) + 1)
+        ))
+
+    def pick(self, count=1):
+        return self.rng.choices(
+            self.population,
+            cum_weights=self.cum_weights,
+            k=count
+        )
+
+
+class Command(BaseCommand):
+    help = 'Заполняет базу синтетическими данными для нагрузочных тестов'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--recipes', type=int, default=10000)
+        parser.add_argument('--ingredients-per-recipe', type=int, default=6)
+        parser.add_argument('--favorites', type=int, default=30000)
+        parser.add_argument('--carts', type=int, default=3000)
+        parser.add_argument('--subscriptions', type=int, default=10000)
+        parser.add_argument(
+            '--skew',
+            type=float,
+            default=1.1,
+            help='Показатель степени распределения Ципфа',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def pairs(self, count, left, right, exclude_self=False):
+        pairs = set()
+        for _ in range(count * 3):
+            if len(pairs) >= count:
+                break
+            pair = (left.pick()[0], right.pick()[0])
+            if not exclude_self or pair[0] != pair[1]:
+                pairs.add(pair)
+        return pairs
+
+    def create_users(self, count):
+        run = uuid.uuid4().hex[:8]
+        password = make_password('benchmark')
+        users = User.objects.bulk_create(
+            (
+                User(
+                    username=f'bench_{run}_{number}',
+                    email=f'bench_{run}_{number}@example.com',
+                    first_name='Бенчмарк',
+                    last_name=f'Пользователь {number}',
+                    password=password,
+                )
+                for number in range(count)
+            ),
+            batch_size=self.batch_size
+        )
+        return [user.id for user in users]
+
+    def create_recipes(self, count, authors, tag_ids):
+        recipes = Recipe.objects.bulk_create(
+            (
+                Recipe(
+                    author_id=author_id,
+                    name=f'{self.rng.choice(WORDS).capitalize()} {number}',
+                    text=' '.join(self.rng.sample(WORDS, 5)),
+                    cooking_time=self.rng.randint(1, 180),
+                    image='recipes/benchmark.png',
+                )
+                for number, author_id in enumerate(authors.pick(count))
+            ),
+            batch_size=self.batch_size
+        )
+        recipe_ids = [recipe.id for recipe in recipes]
+        Recipe.tags.through.objects.bulk_create(
+            (
+                Recipe.tags.through(recipe_id=recipe_id, tag_id=tag_id)
+                for recipe_id in recipe_ids
+                for tag_id in self.rng.sample(
+                    tag_ids,
+                    self.rng.randint(1, len(tag_ids))
+                )
+            ),
+            batch_size=self.batch_size
+        )
+        return recipe_ids
+
+    def create_amounts(self, recipe_ids, ingredients, per_recipe):
+        IngredientAmount.objects.bulk_create(
+            (
+                IngredientAmount(
+                    recipe_id=recipe_id,
+                    ingredient_id=ingredient_id,
+                    amount=self.rng.randint(1, 500),
+                )
+                for recipe_id in recipe_ids
+                for ingredient_id in set(ingredients.pick(
+                    self.rng.randint(1, per_recipe * 2 - 1)
+                ))
+            ),
+            batch_size=self.batch_size
+        )
+
+    def create_pairs(self, model, first, second, pairs):
+        model.objects.bulk_create(
+            (
+                model(**{first: left, second: right})
+                for left, right in pairs
+            ),
+            batch_size=self.batch_size,
+            ignore_conflicts=True
+        )
+
+    def handle(self, *args, **options):
+        if not connection.features.can_return_rows_from_bulk_insert:
+            raise CommandError(
+                'Генерация требует базы, возвращающей id из bulk_create'
+            )
+        ingredient_ids = list(Ingredient.objects.values_list('id', flat=True))
+        if not ingredient_ids:
+            raise CommandError('Сначала загрузите ингредиенты')
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        started = time.monotonic()
+        with transaction.atomic():
+            if not Tag.objects.exists():
+                Tag.objects.bulk_create(
+                    Tag(name=name, color=color, slug=slug)
+                    for name, color, slug in TAGS_DATA
+                )
+            tag_ids = list(Tag.objects.values_list('id', flat=True))
+            user_ids = self.create_users(options['users'])
+            authors = Skewed(self.rng, user_ids, options['skew'])
+            recipe_ids = self.create_recipes(
+                options['recipes'],
+                authors,
+                tag_ids
+            )
+            self.create_amounts(
+                recipe_ids,
+                Skewed(self.rng, ingredient_ids, options['skew']),
+                options['ingredients_per_recipe']
+            )
+            users = Skewed(self.rng, user_ids, 0.5)
+            recipes = Skewed(self.rng, recipe_ids, options['skew'])
+            self.create_pairs(
+                Subscribe,
+                'follow_id',
+                'author_id',
+                self.pairs(
+                    options['subscriptions'],
+                    users,
+                    authors,
+                    exclude_self=True
+                )
+            )
+            self.create_pairs(
+                Favorite,
+                'user_id',
+                'recipe_id',
+                self.pairs(options['favorites'], users, recipes)
+            )
+            self.create_pairs(
+                ShoppingCart,
+                'user_id',
+                'recipe_id',
+                self.pairs(options['carts'], users, recipes)
+            )
+            for model, counter, related_model, field in COUNTERS:
+                repair_counter(model, counter, related_model, field)
+            fill_timelines(user_ids)
+            rebuild_totals(user_ids)
+        bump_version(RECIPES, TAGS, INGREDIENTS)
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано пользователей: {len(user_ids)}, '
+            f'рецептов: {len(recipe_ids)} '
+            f'за {time.monotonic() - started:.1f} с'
+        ))
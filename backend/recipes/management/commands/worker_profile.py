@@ -0,0 +1,125 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+PROBE = '''
+import json
+import time
+
+started = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - started
+with open('/proc/self/status') as status:
+    rss = next(
+        int(line.split()[1]) for line in status if line.startswith('VmRSS:')
+    )
+print(json.dumps({{'seconds': seconds, 'rss_kb': rss}}))
+'''
+
+
+def parse_import_times(output):
+    packages = {}
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        own, _, name = line[len('import time:'):].split('|')
+        package = name.strip().split('.')[0]
+        packages[package] = packages.get(package, 0) + int(own)
+    return sorted(
+        ((spent, package) for package, spent in packages.items()),
+        reverse=True
+    )
+
+
+def read_memory(pid):
+    memory = {}
+    with open(f'/proc/{pid}/smaps_rollup') as rollup:
+        for line in rollup:
+            key, _, value = line.partition(':')
+            if key in ('Rss', 'Pss', 'Shared_Clean', 'Shared_Dirty'):
+                memory[key] = int(value.split()[0])
+    return memory
+
+
+def find_workers(name):
+    for entry in Path('/proc').iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            cmdline = (entry / 'cmdline').read_bytes().split(b'\0')
+        except OSError:
+            continue
+        if any(name.encode() in part for part in cmdline[:2]):
+            yield int(entry.name), b' '.join(cmdline).decode().strip()
+
+
+class Command(BaseCommand):
+    help = 'Показывает время импорта и память при старте воркера'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--module',
+            default='foodgram.wsgi',
+            help='Модуль, импорт которого соответствует старту воркера',
+        )
+        parser.add_argument('--top', type=int, default=15)
+        parser.add_argument(
+            '--running',
+            action='store_true',
+            help='Показать память запущенных процессов gunicorn',
+        )
+
+    def profile_import(self, module, top):
+        environment = {
+            **os.environ,
+            'DJANGO_SETTINGS_MODULE': settings.SETTINGS_MODULE,
+        }
+        result = subprocess.run(
+            [
+                sys.executable,
+                '-X',
+                'importtime',
+                '-c',
+                PROBE.format(module=module),
+            ],
+            cwd=settings.BASE_DIR,
+            env=environment,
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode:
+            raise CommandError(result.stderr.strip().splitlines()[-1])
+        probe = json.loads(result.stdout.strip().splitlines()[-1])
+        self.stdout.write(
+            f'Импорт {module}: {probe["seconds"]:.3f} с, '
+            f'RSS {probe["rss_kb"] / 1024:.1f} МБ'
+        )
+        for spent, package in parse_import_times(result.stderr)[:top]:
+            self.stdout.write(f'{spent / 1000:9.1f} мс  {package}')
+
+    def profile_running(self):
+        found = False
+        for pid, cmdline in find_workers('gunicorn'):
+            try:
+                memory = read_memory(pid)
+            except OSError:
+                continue
+            found = True
+            shared = memory['Shared_Clean'] + memory['Shared_Dirty']
+            self.stdout.write(
+                f'{pid}: RSS {memory["Rss"] / 1024:.1f} МБ, '
+                f'PSS {memory["Pss"] / 1024:.1f} МБ, '
+                f'общая {shared / 1024:.1f} МБ  {cmdline}'
+            )
+        if not found:
+            self.stdout.write('Процессы gunicorn не найдены')
+
+    def handle(self, *args, **options):
+        self.profile_import(options['module'], options['top'])
+        if options['running']:
+            self.profile_running()
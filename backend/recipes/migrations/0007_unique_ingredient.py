@@ -0,0 +1,41 @@
+# Generated by Django 3.2.15 on 2026-10-18 17:47
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def merge_duplicates(apps, schema_editor):
+    Ingredient = apps.get_model('recipes', 'Ingredient')
+    IngredientAmount = apps.get_model('recipes', 'IngredientAmount')
+    groups = Ingredient.objects.order_by().values(
+        'name',
+        'measurement_unit'
+    ).annotate(keep=Min('id'), total=Count('id')).filter(total__gt=1)
+    for group in groups:
+        duplicates = Ingredient.objects.filter(
+            name=group['name'],
+            measurement_unit=group['measurement_unit']
+        ).exclude(id=group['keep'])
+        IngredientAmount.objects.filter(
+            ingredient__in=duplicates
+        ).exclude(
+            recipe__in=IngredientAmount.objects.filter(
+                ingredient_id=group['keep']
+            ).values('recipe')
+        ).update(ingredient_id=group['keep'])
+        duplicates.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0006_shopping_total'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='ingredient',
+            constraint=models.UniqueConstraint(fields=('name', 'measurement_unit'), name='unique_ingredient'),
+        ),
+    ]
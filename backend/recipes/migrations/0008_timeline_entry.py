@@ -0,0 +1,58 @@
+# Generated by Django 3.2.15 on 2026-10-18 17:50
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_timeline(apps, schema_editor):
+    Subscribe = apps.get_model('users', 'Subscribe')
+    Recipe = apps.get_model('recipes', 'Recipe')
+    TimelineEntry = apps.get_model('recipes', 'TimelineEntry')
+    subscriptions = Subscribe.objects.filter(
+        author__followers_count__lte=settings.FEED_FANOUT_LIMIT
+    ).values_list('follow_id', 'author_id')
+    for user_id, author_id in subscriptions.iterator():
+        recipe_ids = Recipe.objects.filter(
+            author_id=author_id
+        ).order_by('-id').values_list(
+            'id',
+            flat=True
+        )[:settings.FEED_BACKFILL_SIZE]
+        TimelineEntry.objects.bulk_create(
+            [
+                TimelineEntry(user_id=user_id, recipe_id=recipe_id)
+                for recipe_id in recipe_ids
+            ],
+            ignore_conflicts=True
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('recipes', '0007_unique_ingredient'),
+        ('users', '0002_user_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TimelineEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('recipe', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timeline_entries', to='recipes.recipe', verbose_name='Рецепт')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timeline', to=settings.AUTH_USER_MODEL, verbose_name='Подписчик')),
+            ],
+            options={
+                'verbose_name': 'Запись ленты',
+                'verbose_name_plural': 'Ленты подписок',
+                'ordering': ['-recipe'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='timelineentry',
+            constraint=models.UniqueConstraint(fields=('user', 'recipe'), name='unique_timeline_entry'),
+        ),
+        migrations.RunPython(fill_timeline, migrations.RunPython.noop),
+    ]
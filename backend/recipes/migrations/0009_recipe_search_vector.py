@@ -0,0 +1,106 @@
+# Generated by Django 3.2.15 on 2026-10-18 17:52
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+CREATE_TRIGGERS = '''
+CREATE FUNCTION recipes_recipe_search_vector() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('russian', coalesce(NEW.name, '')), 'A')
+        || setweight(to_tsvector('russian', coalesce(NEW.text, '')), 'B')
+        || setweight(to_tsvector('russian', coalesce((
+            SELECT string_agg(ingredient.name, ' ')
+            FROM recipes_ingredientamount amount
+            JOIN recipes_ingredient ingredient
+                ON ingredient.id = amount.ingredient_id
+            WHERE amount.recipe_id = NEW.id
+        ), '')), 'C');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER recipes_recipe_search_vector
+    BEFORE INSERT OR UPDATE OF name, text, search_vector
+    ON recipes_recipe
+    FOR EACH ROW EXECUTE FUNCTION recipes_recipe_search_vector();
+
+CREATE FUNCTION recipes_amount_search_vector() RETURNS trigger AS $$
+BEGIN
+    UPDATE recipes_recipe SET search_vector = NULL
+    WHERE id IN (SELECT recipe_id FROM changed_rows);
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER recipes_amount_inserted_search_vector
+    AFTER INSERT ON recipes_ingredientamount
+    REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION recipes_amount_search_vector();
+
+CREATE TRIGGER recipes_amount_updated_search_vector
+    AFTER UPDATE ON recipes_ingredientamount
+    REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION recipes_amount_search_vector();
+
+CREATE TRIGGER recipes_amount_deleted_search_vector
+    AFTER DELETE ON recipes_ingredientamount
+    REFERENCING OLD TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION recipes_amount_search_vector();
+
+CREATE FUNCTION recipes_ingredient_search_vector() RETURNS trigger AS $$
+BEGIN
+    UPDATE recipes_recipe SET search_vector = NULL
+    WHERE id IN (
+        SELECT amount.recipe_id
+        FROM recipes_ingredientamount amount
+        JOIN changed_rows ON changed_rows.id = amount.ingredient_id
+        JOIN previous_rows ON previous_rows.id = changed_rows.id
+        WHERE changed_rows.name IS DISTINCT FROM previous_rows.name
+    );
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER recipes_ingredient_search_vector
+    AFTER UPDATE ON recipes_ingredient
+    REFERENCING OLD TABLE AS previous_rows NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION recipes_ingredient_search_vector();
+
+UPDATE recipes_recipe SET search_vector = NULL;
+'''
+
+DROP_TRIGGERS = '''
+DROP TRIGGER recipes_ingredient_search_vector ON recipes_ingredient;
+DROP FUNCTION recipes_ingredient_search_vector();
+DROP TRIGGER recipes_amount_deleted_search_vector
+    ON recipes_ingredientamount;
+DROP TRIGGER recipes_amount_updated_search_vector
+    ON recipes_ingredientamount;
+DROP TRIGGER recipes_amount_inserted_search_vector
+    ON recipes_ingredientamount;
+DROP FUNCTION recipes_amount_search_vector();
+DROP TRIGGER recipes_recipe_search_vector ON recipes_recipe;
+DROP FUNCTION recipes_recipe_search_vector();
+'''
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0008_timeline_entry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='Поисковый вектор'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='recipe_search_vector_idx'),
+        ),
+        migrations.RunSQL(CREATE_TRIGGERS, DROP_TRIGGERS),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.15 on 2026-10-18 18:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0010_access_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(condition=models.Q(('image_variants', {}), models.Q(('image', ''), _negated=True)), fields=['id'], name='recipe_pending_image_idx'),
+        ),
+    ]
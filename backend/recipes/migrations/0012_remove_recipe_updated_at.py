@@ -0,0 +1,17 @@
+# Generated by Django 3.2.15 on 2026-10-18 18:27
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0011_recipe_pending_image_index'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='recipe',
+            name='updated_at',
+        ),
+    ]
@@ -0,0 +1,38 @@
+from django.db import migrations
+from django.db.models import Sum
+
+BATCH_SIZE = 1000
+
+
+def rebuild_totals(apps, schema_editor):
+    IngredientAmount = apps.get_model('recipes', 'IngredientAmount')
+    ShoppingTotal = apps.get_model('recipes', 'ShoppingTotal')
+    ShoppingTotal.objects.all().delete()
+    rows = IngredientAmount.objects.filter(
+        recipe__shopping_cart__isnull=False
+    ).order_by().values(
+        'recipe__shopping_cart__user',
+        'ingredient'
+    ).annotate(total=Sum('amount'))
+    ShoppingTotal.objects.bulk_create(
+        (
+            ShoppingTotal(
+                user_id=row['recipe__shopping_cart__user'],
+                ingredient_id=row['ingredient'],
+                amount=row['total']
+            )
+            for row in rows.iterator()
+        ),
+        batch_size=BATCH_SIZE
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0012_remove_recipe_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild_totals, migrations.RunPython.noop),
+    ]
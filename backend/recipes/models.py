@@ -1,3 +1,5 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import (
     MinValueValidator,
 )
@@ -45,6 +47,15 @@ class Ingredient(models.Model):
         ordering = ['name']
         verbose_name = 'Ингредиент'
         verbose_name_plural = 'Ингредиенты'
+        constraints = [
+            models.UniqueConstraint(
+                fields=[
+                    'name',
+                    'measurement_unit'
+                ],
+                name='unique_ingredient',
+            )
+        ]
 
     def __str__(self):
         return f'{self.name}, {self.measurement_unit}'
@@ -59,6 +70,12 @@ class Recipe(models.Model):
         'Фото',
         upload_to='recipes/',
     )
+    image_variants = models.JSONField(
+        'Уменьшенные копии фото',
+        default=dict,
+        blank=True,
+        editable=False,
+    )
     text = models.TextField(
         'Описание рецепта'
     )
@@ -67,6 +84,7 @@ class Recipe(models.Model):
         verbose_name='Автор рецепта',
         on_delete=models.CASCADE,
         related_name='recipes',
+        db_index=False,
     )
     ingredients = models.ManyToManyField(
         Ingredient,
@@ -82,11 +100,41 @@ class Recipe(models.Model):
     cooking_time = models.IntegerField(
         'Время готовки',
     )
+    favorites_count = models.PositiveIntegerField(
+        'В избранном',
+        default=0,
+        editable=False,
+    )
+    in_carts_count = models.PositiveIntegerField(
+        'В списках покупок',
+        default=0,
+        editable=False,
+    )
+    search_vector = SearchVectorField(
+        'Поисковый вектор',
+        null=True,
+        editable=False,
+    )
 
     class Meta:
         ordering = ['-id']
         verbose_name = 'Рецепт'
         verbose_name_plural = 'Рецепты'
+        indexes = [
+            models.Index(
+                fields=['author', '-id'],
+                name='recipe_author_id_idx',
+            ),
+            GinIndex(
+                fields=['search_vector'],
+                name='recipe_search_vector_idx',
+            ),
+            models.Index(
+                fields=['id'],
+                name='recipe_pending_image_idx',
+                condition=models.Q(image_variants={}) & ~models.Q(image=''),
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -138,6 +186,7 @@ class Favorite(models.Model):
         Recipe,
         verbose_name='Рецепт в избранном',
         on_delete=models.CASCADE,
+        db_index=False,
         related_name='favorite',
     )
     user = models.ForeignKey(
@@ -145,6 +194,7 @@ class Favorite(models.Model):
         verbose_name='Пользователь',
         related_name='favorite',
         on_delete=models.CASCADE,
+        db_index=False,
     )
 
     class Meta:
@@ -159,18 +209,26 @@ class Favorite(models.Model):
                 name='unique_favorite',
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['recipe', 'user'],
+                name='favorite_recipe_user_idx',
+            )
+        ]
 
 
 class ShoppingCart(models.Model):
     recipe = models.ForeignKey(
         Recipe,
         on_delete=models.CASCADE,
+        db_index=False,
         related_name='shopping_cart',
         verbose_name='Рецепт',
     )
     user = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
+        db_index=False,
         related_name='shopping_cart',
         verbose_name='Добавленное пользователем в список покупок',
     )
@@ -187,3 +245,75 @@ class ShoppingCart(models.Model):
                 name='unique_shopping_cart',
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['recipe', 'user'],
+                name='shopping_cart_recipe_user_idx',
+            )
+        ]
+
+
+class ShoppingTotal(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='shopping_totals',
+        verbose_name='Пользователь',
+    )
+    ingredient = models.ForeignKey(
+        Ingredient,
+        on_delete=models.CASCADE,
+        related_name='shopping_totals',
+        verbose_name='Ингредиент',
+    )
+    amount = models.PositiveIntegerField(
+        'Количество',
+    )
+
+    class Meta:
+        verbose_name = 'Итог списка покупок'
+        verbose_name_plural = 'Итоги списков покупок'
+        constraints = [
+            models.UniqueConstraint(
+                fields=[
+                    'user',
+                    'ingredient'
+                ],
+                name='unique_shopping_total',
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.user}: {self.ingredient} - {self.amount}'
+
+
+class TimelineEntry(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+        verbose_name='Подписчик',
+    )
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+        verbose_name='Рецепт',
+    )
+
+    class Meta:
+        ordering = ['-recipe']
+        verbose_name = 'Запись ленты'
+        verbose_name_plural = 'Ленты подписок'
+        constraints = [
+            models.UniqueConstraint(
+                fields=[
+                    'user',
+                    'recipe'
+                ],
+                name='unique_timeline_entry',
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.recipe} в ленте {self.user}'
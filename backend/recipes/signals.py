@@ -0,0 +1,109 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from users.models import Subscribe, User
+from . import timeline, totals
+from .counters import change_counter
+from .models import Favorite, IngredientAmount, Recipe, ShoppingCart
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_created(sender, instance, created, **kwargs):
+    if created:
+        change_counter(User, instance.author_id, 'recipes_count', 1)
+        timeline.fan_out(instance)
+
+
+@receiver(post_delete, sender=Recipe)
+def recipe_deleted(sender, instance, **kwargs):
+    change_counter(User, instance.author_id, 'recipes_count', -1)
+
+
+@receiver(post_save, sender=Favorite)
+def favorite_created(sender, instance, created, **kwargs):
+    if created:
+        change_counter(Recipe, instance.recipe_id, 'favorites_count', 1)
+
+
+@receiver(post_delete, sender=Favorite)
+def favorite_deleted(sender, instance, **kwargs):
+    change_counter(Recipe, instance.recipe_id, 'favorites_count', -1)
+
+
+@receiver(post_save, sender=ShoppingCart)
+def shopping_cart_created(sender, instance, created, **kwargs):
+    if created:
+        change_counter(Recipe, instance.recipe_id, 'in_carts_count', 1)
+
+
+@receiver(post_delete, sender=ShoppingCart)
+def shopping_cart_deleted(sender, instance, **kwargs):
+    change_counter(Recipe, instance.recipe_id, 'in_carts_count', -1)
+
+
+@receiver(pre_save, sender=ShoppingCart)
+def shopping_cart_saving(sender, instance, **kwargs):
+    instance._previous = None
+    if instance.pk is not None:
+        instance._previous = ShoppingCart.objects.filter(
+            pk=instance.pk
+        ).values_list('user_id', 'recipe_id').first()
+
+
+@receiver(post_save, sender=ShoppingCart)
+def shopping_cart_totals_added(sender, instance, created, **kwargs):
+    current = (instance.user_id, instance.recipe_id)
+    if instance._previous == current:
+        return
+    if instance._previous is not None:
+        user_id, recipe_id = instance._previous
+        totals.remove_recipes(user_id, [recipe_id])
+    totals.add_recipes(instance.user_id, [instance.recipe_id])
+
+
+@receiver(post_delete, sender=ShoppingCart)
+def shopping_cart_totals_removed(sender, instance, **kwargs):
+    totals.remove_recipes(instance.user_id, [instance.recipe_id])
+
+
+@receiver(pre_save, sender=IngredientAmount)
+def ingredient_amount_saving(sender, instance, **kwargs):
+    instance._previous = None
+    if instance.pk is not None:
+        instance._previous = IngredientAmount.objects.filter(
+            pk=instance.pk
+        ).values_list('ingredient_id', 'amount').first()
+
+
+@receiver(post_save, sender=IngredientAmount)
+def ingredient_amount_totals_changed(sender, instance, **kwargs):
+    if instance._previous is not None:
+        totals.remove_ingredient_from_carts(
+            instance.recipe_id,
+            *instance._previous
+        )
+    totals.add_ingredient_to_carts(
+        instance.recipe_id,
+        instance.ingredient_id,
+        instance.amount
+    )
+
+
+@receiver(post_delete, sender=IngredientAmount)
+def ingredient_amount_totals_removed(sender, instance, **kwargs):
+    totals.remove_ingredient_from_carts(
+        instance.recipe_id,
+        instance.ingredient_id,
+        instance.amount
+    )
+
+
+@receiver(post_save, sender=Subscribe)
+def subscribe_timeline_backfilled(sender, instance, created, **kwargs):
+    if created:
+        timeline.backfill(instance.follow_id, instance.author_id)
+
+
+@receiver(post_delete, sender=Subscribe)
+def subscribe_timeline_pruned(sender, instance, **kwargs):
+    timeline.prune(instance.follow_id, instance.author_id)
@@ -0,0 +1,113 @@
+from django.conf import settings
+from django.db import connection
+
+from users.models import Subscribe, User
+from .models import Recipe, TimelineEntry
+from .utils import batched
+
+
+def is_popular(author_id):
+    return User.objects.filter(
+        pk=author_id,
+        followers_count__gt=settings.FEED_FANOUT_LIMIT
+    ).exists()
+
+
+def fan_out(recipe):
+    if is_popular(recipe.author_id):
+        return
+    follower_ids = Subscribe.objects.filter(
+        author_id=recipe.author_id
+    ).values_list('follow_id', flat=True).iterator()
+    for batch in batched(follower_ids, settings.FEED_FANOUT_BATCH_SIZE):
+        TimelineEntry.objects.bulk_create(
+            [
+                TimelineEntry(user_id=user_id, recipe_id=recipe.id)
+                for user_id in batch
+            ],
+            ignore_conflicts=True
+        )
+
+
+def backfill(user_id, author_id):
+    if is_popular(author_id):
+        return
+    recipe_ids = Recipe.objects.filter(
+        author_id=author_id
+    ).values_list('id', flat=True)[:settings.FEED_BACKFILL_SIZE]
+    TimelineEntry.objects.bulk_create(
+        [
+            TimelineEntry(user_id=user_id, recipe_id=recipe_id)
+            for recipe_id in recipe_ids
+        ],
+        ignore_conflicts=True
+    )
+
+
+def prune(user_id, author_id):
+    TimelineEntry.objects.filter(
+        user_id=user_id,
+        recipe__author_id=author_id
+    ).delete()
+
+
+def fill_timelines(user_ids):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'INSERT INTO recipes_timelineentry (user_id, recipe_id) '
+            'SELECT subscribe.follow_id, recipe.id '
+            'FROM users_subscribe subscribe '
+            'JOIN users_user author ON author.id = subscribe.author_id '
+            'CROSS JOIN LATERAL ('
+            'SELECT id FROM recipes_recipe '
+            'WHERE author_id = subscribe.author_id '
+            'ORDER BY id DESC LIMIT %s'
+            ') recipe '
+            'WHERE author.followers_count <= %s '
+            'AND subscribe.follow_id = ANY(%s) '
+            'ON CONFLICT DO NOTHING',
+            [
+                settings.FEED_BACKFILL_SIZE,
+                settings.FEED_FANOUT_LIMIT,
+                list(user_ids)
+            ]
+        )
+
+
+def fan_out_recipes(recipe_ids):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'INSERT INTO recipes_timelineentry (user_id, recipe_id) '
+            'SELECT subscribe.follow_id, recipe.id '
+            'FROM recipes_recipe recipe '
+            'JOIN users_user author ON author.id = recipe.author_id '
+            'JOIN users_subscribe subscribe '
+            'ON subscribe.author_id = recipe.author_id '
+            'WHERE author.followers_count <= %s '
+            'AND recipe.id = ANY(%s) '
+            'ON CONFLICT DO NOTHING',
+            [settings.FEED_FANOUT_LIMIT, list(recipe_ids)]
+        )
+
+
+def get_feed_ids(user, before=None, limit=10):
+    entries = TimelineEntry.objects.filter(user=user)
+    popular = Recipe.objects.filter(
+        author__in=Subscribe.objects.filter(
+            follow=user,
+            author__followers_count__gt=settings.FEED_FANOUT_LIMIT
+        ).values('author')
+    )
+    if before is not None:
+        entries = entries.filter(recipe_id__lt=before)
+        popular = popular.filter(id__lt=before)
+    recipe_ids = set(
+        entries.order_by('-recipe_id').values_list(
+            'recipe_id',
+            flat=True
+        )[:limit]
+    )
+    recipe_ids.update(
+        popular.order_by('-id').values_list('id', flat=True)[:limit]
+    )
+    return sorted(recipe_ids, reverse=True)[:limit]
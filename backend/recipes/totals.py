@@ -0,0 +1,95 @@
+from django.db import connection
+from django.db.models import F, IntegerField, Sum, Value
+
+from .models import IngredientAmount, ShoppingCart, ShoppingTotal
+
+
+def get_table():
+    return connection.ops.quote_name(ShoppingTotal._meta.db_table)
+
+
+def add_totals(source):
+    sql, params = source.query.sql_with_params()
+    table = get_table()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table} (user_id, ingredient_id, amount) {sql} '
+            f'ON CONFLICT (user_id, ingredient_id) DO UPDATE '
+            f'SET amount = {table}.amount + EXCLUDED.amount',
+            params
+        )
+
+
+def subtract_totals(source):
+    sql, params = source.query.sql_with_params()
+    table = get_table()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'UPDATE {table} '
+            f'SET amount = GREATEST({table}.amount - delta.total_amount, 0) '
+            f'FROM ({sql}) AS delta '
+            f'WHERE {table}.user_id = delta.total_user '
+            f'AND {table}.ingredient_id = delta.total_ingredient',
+            params
+        )
+        cursor.execute(
+            f'DELETE FROM {table} WHERE amount <= 0 AND user_id IN '
+            f'(SELECT delta.total_user FROM ({sql}) AS delta)',
+            params
+        )
+
+
+def get_recipes_source(user_id, recipe_ids):
+    return IngredientAmount.objects.filter(
+        recipe_id__in=recipe_ids
+    ).order_by().values(
+        total_user=Value(user_id, output_field=IntegerField()),
+        total_ingredient=F('ingredient'),
+    ).annotate(total_amount=Sum('amount'))
+
+
+def get_carts_source(recipe_id, ingredient_id, amount):
+    return ShoppingCart.objects.filter(
+        recipe_id=recipe_id
+    ).order_by().values(
+        total_user=F('user'),
+        total_ingredient=Value(ingredient_id, output_field=IntegerField()),
+        total_amount=Value(amount, output_field=IntegerField()),
+    )
+
+
+def add_recipes(user_id, recipe_ids):
+    add_totals(get_recipes_source(user_id, recipe_ids))
+
+
+def remove_recipes(user_id, recipe_ids):
+    subtract_totals(get_recipes_source(user_id, recipe_ids))
+
+
+def get_carted_source(**filters):
+    if not filters:
+        filters = {'recipe__shopping_cart__isnull': False}
+    return IngredientAmount.objects.filter(**filters).order_by().values(
+        total_user=F('recipe__shopping_cart__user'),
+        total_ingredient=F('ingredient'),
+    ).annotate(total_amount=Sum('amount'))
+
+
+def add_recipe_to_carts(recipe_id):
+    add_totals(get_carted_source(
+        recipe_id=recipe_id,
+        recipe__shopping_cart__isnull=False
+    ))
+
+
+def add_ingredient_to_carts(recipe_id, ingredient_id, amount):
+    add_totals(get_carts_source(recipe_id, ingredient_id, amount))
+
+
+def remove_ingredient_from_carts(recipe_id, ingredient_id, amount):
+    subtract_totals(get_carts_source(recipe_id, ingredient_id, amount))
+
+
+def rebuild_totals(user_ids):
+    ShoppingTotal.objects.filter(user_id__in=user_ids).delete()
+    add_totals(get_carted_source(recipe__shopping_cart__user__in=user_ids))
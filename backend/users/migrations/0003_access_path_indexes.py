@@ -0,0 +1,29 @@
+# Generated by Django 3.2.15 on 2026-10-18 17:54
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_user_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='subscribe',
+            index=models.Index(fields=['author', 'follow'], name='subscribe_author_follow_idx'),
+        ),
+        migrations.AlterField(
+            model_name='subscribe',
+            name='author',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='author', to=settings.AUTH_USER_MODEL, verbose_name='На кого подписываются'),
+        ),
+        migrations.AlterField(
+            model_name='subscribe',
+            name='follow',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='follow', to=settings.AUTH_USER_MODEL, verbose_name='Подписчик'),
+        ),
+    ]
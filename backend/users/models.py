@@ -37,6 +37,16 @@ class User(AbstractUser):
         default=USER,
         blank=True,
     )
+    recipes_count = models.PositiveIntegerField(
+        'Количество рецептов',
+        default=0,
+        editable=False,
+    )
+    followers_count = models.PositiveIntegerField(
+        'Количество подписчиков',
+        default=0,
+        editable=False,
+    )
 
     class Meta:
         ordering = ['-id']
@@ -64,12 +74,14 @@ class Subscribe(models.Model):
     follow = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
+        db_index=False,
         verbose_name='Подписчик',
         related_name='follow',
     )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
+        db_index=False,
         verbose_name='На кого подписываются',
         related_name='author',
     )
@@ -87,6 +99,12 @@ class Subscribe(models.Model):
                 name='unique_subscribe'
             ),
         )
+        indexes = (
+            models.Index(
+                fields=['author', 'follow'],
+                name='subscribe_author_follow_idx',
+            ),
+        )
 
     def __str__(self):
         return f"{self.follow} подписан на {self.author}"
@@ -0,0 +1,16 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from recipes.counters import change_counter
+from .models import Subscribe, User
+
+
+@receiver(post_save, sender=Subscribe)
+def subscribe_created(sender, instance, created, **kwargs):
+    if created:
+        change_counter(User, instance.author_id, 'followers_count', 1)
+
+
+@receiver(post_delete, sender=Subscribe)
+def subscribe_deleted(sender, instance, **kwargs):
+    change_counter(User, instance.author_id, 'followers_count', -1)